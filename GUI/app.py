@@ -1,24 +1,274 @@
-from Compiler.compile_source import compile_source
+from compiler.compile_source import CompilationResult
+from compiler.stream_compilation import compile_file
+from compiler.incremental_compilation import IncrementalCompiler, DirtyLines, changed_ranges
+import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 
 # ------------------------
 # GUI Setup with Enhanced Styling
 # ------------------------
-def compile_code():
-    source = code_input.get("1.0", tk.END).strip()
-    if not source:
-        messagebox.showwarning("Input Required", "Please enter some source code.")
+COMPILE_ON_TYPE_DELAY_MS = 300
+# Every edit that changes the IR still allocates registers for the whole
+# program, so compile on type waits for Compile above this many lines.
+COMPILE_ON_TYPE_MAX_LINES = 2000
+POLL_INTERVAL_MS = 50
+OUTPUT_CHUNK_SIZE = 1 << 16
+
+incremental_compiler = IncrementalCompiler()
+dirty_lines = DirtyLines()
+compile_after_id = None
+
+# Compilation runs on a worker thread that reports back through
+# compile_queue; only one job runs at a time, and a compile requested while
+# one is running cancels it and starts again once it has stopped. A large
+# file compile is not cancelled that way: the editor compile waits for it.
+compile_queue = queue.Queue()
+cancel_event = None
+compile_pending = False
+compiling_file = False
+insert_after_id = None
+# The report sections, as (phase, pieces), shown in the output area, or
+# None while it holds anything else (e.g. half an insert), so the next
+# report replaces it whole.
+shown_sections = None
+OUTPUT_MARK = "compile_output"
+
+def start_worker(target, *args):
+    global cancel_event
+    cancel_event = threading.Event()
+    threading.Thread(target=target, args=args + (cancel_event,), daemon=True).start()
+    cancel_button.config(state=tk.NORMAL)
+    root.after(POLL_INTERVAL_MS, poll_compilation)
+
+def compile_code(quiet=False):
+    global compile_pending
+    if cancel_event is not None:
+        if not compiling_file:
+            cancel_event.set()
+        compile_pending = True
+        return
+    if incremental_var.get():
+        # Not stripped, so token positions are the editor's own lines and
+        # match the edited line ranges.
+        source = code_input.get("1.0", "end-1c")
+    else:
+        source = code_input.get("1.0", tk.END).strip()
+    if not source.strip():
+        if not quiet:
+            messagebox.showwarning("Input Required", "Please enter some source code.")
+        return
+    first_line, last_line = dirty_lines.take() if incremental_var.get() else (None, None)
+    stop_output()
+    start_worker(compile_worker, source, incremental_var.get(), first_line, last_line, optimize_var.get(), shown_sections)
+    status_var.set("Compiling...")
+
+def compile_worker(source, incremental, first_line, last_line, optimize, shown, cancelled):
+    # Runs off the Tk thread, so it must not touch any widget. Only the lines
+    # that differ from the shown report are sent back to be redrawn.
+    try:
+        if incremental:
+            result = incremental_compiler.update(source, first_line, last_line, optimize=optimize)
+        else:
+            result = CompilationResult(source, optimize=optimize)
+        sections = []
+        for phase, pieces in result.iter_sections():
+            if cancelled.is_set():
+                compile_queue.put(('cancelled', None))
+                return
+            sections.append((phase, list(pieces)))
+            compile_queue.put(('progress', f"Compiling... {phase} done"))
+        ranges = changed_ranges(shown, sections) if shown is not None else None
+        compile_queue.put(('done', (sections, ranges, result.error)))
+    except Exception as e:
+        compile_queue.put(('failed', e))
+
+def compile_file_worker(source_path, ir_path, target_path, cancelled):
+    # Like compile_worker: reports through compile_queue, one message per block.
+    try:
+        size = os.path.getsize(source_path) or 1
+
+        def progress(statements, characters):
+            compile_queue.put(('progress', f"Compiling {source_path}... {statements} statements "
+                                           f"({min(100, 100 * characters // size)}%)"))
+
+        summary = compile_file(source_path, ir_path, target_path, progress=progress, cancelled=cancelled)
+        compile_queue.put(('file_done', (summary, ir_path, target_path)))
+    except Exception as e:
+        compile_queue.put(('failed', e))
+
+def poll_compilation():
+    global cancel_event, compile_pending, compiling_file
+    finished = False
+    while True:
+        try:
+            message, payload = compile_queue.get_nowait()
+        except queue.Empty:
+            break
+        if message == 'progress':
+            status_var.set(payload)
+            continue
+        finished = True
+        if message == 'file_done':
+            summary, ir_path, target_path = payload
+            if summary['cancelled']:
+                status_var.set(f"Compilation cancelled after {summary['statements']} statements.")
+            elif summary['error']:
+                messagebox.showerror("Compilation Error", summary['error'])
+                status_var.set(f"Stopped after {summary['statements']} statements: {summary['error']}")
+            else:
+                status_var.set(f"Compiled {summary['statements']} statements to {target_path} and {ir_path}")
+        elif message == 'done' and cancel_event.is_set():
+            status_var.set("Compilation cancelled.")
+        elif message == 'done':
+            sections, ranges, error = payload
+            start_output(sections, ranges, "Compilation finished with errors." if error else "Compilation finished successfully.")
+        elif message == 'failed':
+            messagebox.showerror("Compilation Failed", str(payload))
+            status_var.set("Compilation failed.")
+        else:
+            status_var.set("Compilation cancelled.")
+    if not finished:
+        root.after(POLL_INTERVAL_MS, poll_compilation)
         return
-    result = compile_source(source)
+    cancel_event = None
+    compiling_file = False
+    if insert_after_id is None:
+        cancel_button.config(state=tk.DISABLED)
+    if compile_pending:
+        compile_pending = False
+        compile_code(quiet=True)
+
+def start_output(sections, ranges, final_status):
+    # ranges is changed_ranges(shown_sections, sections), or None to replace
+    # everything. Whole lines are deleted, bottom up so that the line numbers
+    # of the ranges above stay valid, and a mark is left where each range's
+    # new lines go; no character offsets into the report are needed.
+    global shown_sections
+    shown_sections = None
     output_area.config(state=tk.NORMAL)
-    output_area.delete("1.0", tk.END)
-    output_area.insert(tk.END, result)
+    line_count = int(output_area.index("end-1c").split(".")[0])
+    if ranges is None:
+        ranges = [(0, line_count, [piece for _, pieces in sections for piece in pieces])]
+    inserts = []
+    for number in reversed(range(len(ranges))):
+        first_line, last_line, pieces = ranges[number]
+        text = "\n".join(pieces)
+        if last_line < line_count:
+            start = f"{first_line + 1}.0"
+            output_area.delete(start, f"{last_line + 1}.0")
+            text = text + "\n" if pieces else ""
+        elif first_line:
+            start = f"{first_line}.end"
+            output_area.delete(start, "end-1c")
+            text = "\n" + text if pieces else ""
+        else:
+            start = "1.0"
+            output_area.delete(start, tk.END)
+        mark = f"{OUTPUT_MARK}{number}"
+        output_area.mark_set(mark, start)
+        inserts.append((mark, text))
     output_area.config(state=tk.DISABLED)
-    status_var.set("Compilation finished successfully.")
+    inserts.reverse()
+    insert_output(inserts, 0, sections, final_status)
+
+def insert_output(inserts, offset, sections, final_status):
+    # A chunk per event-loop turn keeps the window responsive while a
+    # multi-megabyte report is inserted. Each mark moves past its chunks.
+    global insert_after_id, shown_sections
+    if inserts:
+        mark, text = inserts[0]
+        output_area.config(state=tk.NORMAL)
+        output_area.insert(mark, text[offset:offset + OUTPUT_CHUNK_SIZE])
+        output_area.config(state=tk.DISABLED)
+        offset += OUTPUT_CHUNK_SIZE
+        if offset >= len(text):
+            inserts, offset = inserts[1:], 0
+    if inserts:
+        status_var.set(f"Showing output... {100 * offset // max(len(inserts[0][1]), 1)}%")
+        insert_after_id = root.after(1, insert_output, inserts, offset, sections, final_status)
+    else:
+        insert_after_id = None
+        shown_sections = sections
+        status_var.set(final_status)
+        if cancel_event is None:
+            cancel_button.config(state=tk.DISABLED)
+
+def stop_output():
+    global insert_after_id
+    if insert_after_id is not None:
+        root.after_cancel(insert_after_id)
+        insert_after_id = None
+
+def cancel_compilation():
+    global compile_pending
+    compile_pending = False
+    if cancel_event is not None:
+        cancel_event.set()
+        status_var.set("Cancelling...")
+    elif insert_after_id is not None:
+        stop_output()
+        status_var.set("Output cancelled.")
+    cancel_button.config(state=tk.DISABLED)
+
+def compile_on_type():
+    global compile_after_id
+    compile_after_id = None
+    if int(code_input.index("end-1c").split(".")[0]) > COMPILE_ON_TYPE_MAX_LINES:
+        status_var.set(f"Compile on type is paused for sources over {COMPILE_ON_TYPE_MAX_LINES} lines; press Compile.")
+        return
+    compile_code(quiet=True)
+
+def schedule_compile():
+    # Waits for a pause in typing so a burst of keystrokes compiles once.
+    global compile_after_id
+    if compile_after_id is not None:
+        root.after_cancel(compile_after_id)
+    compile_after_id = root.after(COMPILE_ON_TYPE_DELAY_MS, compile_on_type)
+
+def toggle_compile_on_type():
+    if compile_on_type_var.get():
+        incremental_var.set(True)
+        schedule_compile()
+
+def track_edits(widget):
+    # Route the Text widget's Tcl command through Python so every insert and
+    # delete (typing, paste, undo, open, clear) marks the lines it touches.
+    original = widget._w + "_original"
+    widget.tk.call("rename", widget._w, original)
+
+    def line_of(index):
+        # Tk inserts at "end" just before its final newline, so clamp to the last real line.
+        line = int(str(widget.tk.call(original, "index", index)).split(".")[0])
+        return min(line, int(str(widget.tk.call(original, "index", "end-1c")).split(".")[0]))
+
+    def proxy(command, *args):
+        if command in ("insert", "delete", "replace"):
+            if command == "insert":
+                first_line = line_of(args[0])
+                texts = args[1::2]
+            else:
+                first_line = line_of(args[0])
+                last_line = line_of(args[1]) if len(args) > 1 else line_of(f"{args[0]} +1c")
+                dirty_lines.deleted(first_line, last_line)
+                texts = args[2::2] if command == "replace" else ()
+            if command != "delete":
+                dirty_lines.inserted(first_line, sum(str(text).count("\n") for text in texts))
+            result = widget.tk.call((original, command) + args)
+            if compile_on_type_var.get():
+                schedule_compile()
+            return result
+        return widget.tk.call((original, command) + args)
+
+    widget.tk.createcommand(widget._w, proxy)
 
 def clear_text():
+    global shown_sections
+    cancel_compilation()
     code_input.delete("1.0", tk.END)
+    shown_sections = None
     output_area.config(state=tk.NORMAL)
     output_area.delete("1.0", tk.END)
     output_area.config(state=tk.DISABLED)
@@ -32,6 +282,24 @@ def open_file():
             code_input.insert(tk.END, file.read())
         status_var.set(f"Loaded file: {file_path}")
 
+def compile_large_file():
+    # Streams the file through the compiler without loading it into the editor;
+    # target code goes to the chosen file and IR next to it with a .ir suffix.
+    global compiling_file
+    if cancel_event is not None:
+        messagebox.showwarning("Compilation Running", "Wait for the current compilation to finish or cancel it.")
+        return
+    source_path = filedialog.askopenfilename(title="Compile Large Source File", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
+    if not source_path:
+        return
+    target_path = filedialog.asksaveasfilename(title="Save Target Code", defaultextension=".asm", filetypes=[("Assembly", "*.asm"), ("All Files", "*.*")])
+    if not target_path:
+        return
+    ir_path = os.path.splitext(target_path)[0] + ".ir"
+    compiling_file = True
+    start_worker(compile_file_worker, source_path, ir_path, target_path)
+    status_var.set(f"Compiling {source_path}...")
+
 def save_output():
     file_path = filedialog.asksaveasfilename(title="Save Output", defaultextension=".txt", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
     if file_path:
@@ -57,6 +325,7 @@ style.configure("TFrame", background="#EEF2F7")
 menubar = tk.Menu(root)
 file_menu = tk.Menu(menubar, tearoff=0)
 file_menu.add_command(label="Open", command=open_file)
+file_menu.add_command(label="Compile Large File...", command=compile_large_file)
 file_menu.add_command(label="Save Output", command=save_output)
 file_menu.add_separator()
 file_menu.add_command(label="Exit", command=root.quit)
@@ -83,6 +352,7 @@ input_label.pack(anchor="w", pady=(0, 5))
 # Source code input area
 code_input = scrolledtext.ScrolledText(main_frame, height=10, wrap=tk.WORD, font=("Consolas", 12), bg="#F7F9FB")
 code_input.pack(fill=tk.BOTH, expand=False, pady=(0, 15))
+track_edits(code_input)
 
 # Button frame
 button_frame = ttk.Frame(main_frame)
@@ -94,9 +364,24 @@ compile_button.pack(side=tk.LEFT, padx=(0, 10))
 clear_button = ttk.Button(button_frame, text="Clear", command=clear_text)
 clear_button.pack(side=tk.LEFT, padx=(0, 10))
 
+cancel_button = ttk.Button(button_frame, text="Cancel", command=cancel_compilation, state=tk.DISABLED)
+cancel_button.pack(side=tk.LEFT, padx=(0, 10))
+
 exit_button = ttk.Button(button_frame, text="Exit", command=root.quit)
 exit_button.pack(side=tk.LEFT)
 
+optimize_var = tk.BooleanVar(value=False)
+optimize_check = ttk.Checkbutton(button_frame, text="Optimize IR", variable=optimize_var)
+optimize_check.pack(side=tk.LEFT, padx=(10, 0))
+
+incremental_var = tk.BooleanVar(value=False)
+incremental_check = ttk.Checkbutton(button_frame, text="Incremental", variable=incremental_var)
+incremental_check.pack(side=tk.LEFT, padx=(10, 0))
+
+compile_on_type_var = tk.BooleanVar(value=False)
+compile_on_type_check = ttk.Checkbutton(button_frame, text="Compile on type", variable=compile_on_type_var, command=toggle_compile_on_type)
+compile_on_type_check.pack(side=tk.LEFT, padx=(10, 0))
+
 # Output label
 output_label = ttk.Label(main_frame, text="Compilation Output:")
 output_label.pack(anchor="w", pady=(0, 5))
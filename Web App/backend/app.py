@@ -1,253 +1,259 @@
-import re
-from flask import Flask, request
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+from flask import Flask, Response, request, stream_with_context
 from flask_cors import CORS
 
+from compiler import CompilationResult, MetricsRegistry, PHASES, set_profile_sampling
+from compiler.artifact_cache import ArtifactCache, default_cache_path
+
 app = Flask(__name__)
 app.secret_key = "test-key"
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 # ------------------------
-# Lexical Analysis
+# Batch Compilation
 # ------------------------
-def lexical_analysis(source_code):
-    token_specification = [
-        ('NUMBER',   r'\d+(\.\d+)?'),
-        ('ID',       r'[A-Za-z_]\w*'),
-        ('ASSIGN',   r'='),
-        ('PLUS',     r'\+'),
-        ('MINUS',    r'-'),
-        ('MUL',      r'\*'),
-        ('DIV',      r'/'),
-        ('LPAREN',   r'\('),
-        ('RPAREN',   r'\)'),
-        ('SEMI',     r';'),
-        ('SKIP',     r'[ \t]+'),
-        ('NEWLINE',  r'\n'),
-        ('MISMATCH', r'.'),
-    ]
-    tokens = []
-    tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
-    line_num = 1
-    line_start = 0
-    for mo in re.finditer(tok_regex, source_code):
-        kind = mo.lastgroup
-        value = mo.group()
-        column = mo.start() - line_start + 1
-        if kind == 'NUMBER':
-            tokens.append(('NUMBER', value, line_num, column))
-        elif kind == 'ID':
-            tokens.append(('ID', value, line_num, column))
-        elif kind in ('ASSIGN', 'PLUS', 'MINUS', 'MUL', 'DIV', 'LPAREN', 'RPAREN', 'SEMI'):
-            tokens.append((kind, value, line_num, column))
-        elif kind == 'NEWLINE':
-            line_num += 1
-            line_start = mo.end()
-        elif kind == 'SKIP':
-            continue
-        elif kind == 'MISMATCH':
-            raise RuntimeError(f'Lexical Error: Unexpected character {value!r} at line {line_num} column {column}')
-    tokens.append(('EOF', None, line_num, column))
-    return tokens
+BATCH_WORKERS = os.cpu_count() or 1
+MAX_BATCH_SOURCES = 100000
 
-# ------------------------
-# Parser (Syntax Analysis)
-# ------------------------
-class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.index = 0
-
-    def current_token(self):
-        if self.index < len(self.tokens):
-            return self.tokens[self.index]
-        return ('EOF', None, -1, -1)
-
-    def error(self, expected):
-        token = self.current_token()
-        token_type, token_value, line, column = token
-        raise SyntaxError(f"Syntax Error: Expected {expected} at line {line} column {column}, got '{token_value}' ({token_type}).")
-
-    def eat(self, token_type):
-        token = self.current_token()
-        if token[0] == token_type:
-            self.index += 1
-            return token
-        else:
-            self.error(token_type)
-
-    def parse_program(self):
-        statements = []
-        while self.current_token()[0] != 'EOF':
-            while self.current_token()[0] == 'SEMI':
-                self.eat('SEMI')
-            if self.current_token()[0] == 'EOF':
-                break
-            stmt = self.statement()
-            statements.append(stmt)
-            if self.current_token()[0] == 'SEMI':
-                self.eat('SEMI')
-            else:
-                token = self.current_token()
-                raise SyntaxError(f"Syntax Error: Missing semicolon at line {token[2]} column {token[3]}.")
-        return statements
-
-    def statement(self):
-        token = self.eat('ID')
-        var_name = token[1]
-        self.eat('ASSIGN')
-        expr_node = self.expression()
-        return {'type': 'assignment', 'target': var_name, 'expression': expr_node}
-
-    def expression(self):
-        node = self.term()
-        while self.current_token()[0] in ('PLUS', 'MINUS'):
-            token = self.current_token()
-            if token[0] == 'PLUS':
-                self.eat('PLUS')
-                node = {'type': 'binary_op', 'operator': '+', 'left': node, 'right': self.term()}
-            elif token[0] == 'MINUS':
-                self.eat('MINUS')
-                node = {'type': 'binary_op', 'operator': '-', 'left': node, 'right': self.term()}
-        return node
-
-    def term(self):
-        node = self.factor()
-        while self.current_token()[0] in ('MUL', 'DIV'):
-            token = self.current_token()
-            if token[0] == 'MUL':
-                self.eat('MUL')
-                node = {'type': 'binary_op', 'operator': '*', 'left': node, 'right': self.factor()}
-            elif token[0] == 'DIV':
-                self.eat('DIV')
-                node = {'type': 'binary_op', 'operator': '/', 'left': node, 'right': self.factor()}
-        return node
-
-    def factor(self):
-        token = self.current_token()
-        if token[0] == 'NUMBER':
-            self.eat('NUMBER')
-            return {'type': 'number', 'value': float(token[1]) if '.' in token[1] else int(token[1])}
-        elif token[0] == 'ID':
-            self.eat('ID')
-            return {'type': 'identifier', 'name': token[1]}
-        elif token[0] == 'LPAREN':
-            self.eat('LPAREN')
-            node = self.expression()
-            self.eat('RPAREN')
-            return node
-        else:
-            self.error("NUMBER, identifier, or '('")
+batch_executor = None
+batch_executor_lock = threading.Lock()
 
-def syntax_analysis(tokens):
-    parser = Parser(tokens)
-    return parser.parse_program()
+def get_batch_executor():
+    # One pool shared by all batch requests, started on first use.
+    global batch_executor
+    with batch_executor_lock:
+        if batch_executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            batch_executor = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return batch_executor
 
 # ------------------------
-# Semantic Analysis
+# Compile Cache
 # ------------------------
-def semantic_analysis(ast_list):
-    def fold(node):
-        if node['type'] == 'binary_op':
-            left = fold(node['left'])
-            right = fold(node['right'])
-            if left['type'] == 'number' and right['type'] == 'number':
-                op = node['operator']
-                if op == '+':
-                    value = left['value'] + right['value']
-                elif op == '-':
-                    value = left['value'] - right['value']
-                elif op == '*':
-                    value = left['value'] * right['value']
-                elif op == '/':
-                    if right['value'] == 0:
-                        raise RuntimeError("Semantic Error: Division by zero.")
-                    value = left['value'] / right['value']
-                return {'type': 'number', 'value': value}
-            else:
-                return {'type': 'binary_op', 'operator': node['operator'], 'left': left, 'right': right}
-        else:
-            return node
+COMPILE_CACHE_MAX_ENTRIES = 1024
+COMPILE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+PHASE_CACHE_ENABLED = True
 
-    for ast in ast_list:
-        ast['expression'] = fold(ast['expression'])
-    return ast_list
+# Finished results are also kept on disk, so a restarted server, the ASGI
+# workers, batch workers and the CLI all reuse each other's compiles. The
+# default location can be moved with COMPILER_ARTIFACT_CACHE; set this to
+# None to keep everything in memory.
+ARTIFACT_CACHE_PATH = default_cache_path()
+artifact_cache = ArtifactCache(ARTIFACT_CACHE_PATH) if ARTIFACT_CACHE_PATH else None
 
-# ------------------------
-# Intermediate Code Generation
-# ------------------------
-def intermediate_code_generation(ast_list):
-    code_lines = []
-    temp_counter = 1
-
-    def generate(node):
-        nonlocal temp_counter
-        if node['type'] == 'number':
-            return str(node['value'])
-        elif node['type'] == 'identifier':
-            return node['name']
-        elif node['type'] == 'binary_op':
-            left = generate(node['left'])
-            right = generate(node['right'])
-            temp = f"t{temp_counter}"
-            temp_counter += 1
-            code_lines.append(f"{temp} = {left} {node['operator']} {right}")
-            return temp
+# Fraction of compiles that record per-phase metrics for /metrics; 0 turns
+# profiling off entirely.
+PROFILE_SAMPLE_RATE = 0.0
+set_profile_sampling(PROFILE_SAMPLE_RATE)
+phase_metrics = MetricsRegistry()
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and total size in bytes."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self.lock:
+            if size > self.max_bytes:
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+result_cache = LRUCache(COMPILE_CACHE_MAX_ENTRIES, COMPILE_CACHE_MAX_BYTES)
+phase_cache = LRUCache(COMPILE_CACHE_MAX_ENTRIES, COMPILE_CACHE_MAX_BYTES)
+
+# Characters of report text per line sent by /compile/stream.
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Rough memory kept per token by a cached result (ASTs, IR and target code).
+PHASE_CACHE_BYTES_PER_TOKEN = 64
+
+def source_key(source_code):
+    return hashlib.sha256(source_code.encode("utf-8")).hexdigest()
+
+def token_key(tokens):
+    # Joining the token values with a separator gives a canonical,
+    # whitespace-insensitive spelling of the program.
+    return source_key(" ".join(token[1] or "" for token in tokens))
+
+def reuse_phases(result, previous):
+    # Everything after lexing depends only on the token kinds and values, so a
+    # whitespace-only edit can take over the earlier result's ASTs, IR and
+    # target code. Syntax errors carry positions and are recomputed instead.
+    # previous is finished (see share_result) and is only read here.
+    if isinstance(previous.error, SyntaxError):
+        return
+    result.ast_list = previous.ast_list
+    result.folded_ast_list = previous.folded_ast_list
+    result.instructions = previous.instructions
+    result.optimized_instructions = previous.optimized_instructions
+    result.optimization_report = previous.optimization_report
+    result.machine_code = previous.machine_code
+    result.target_stats = previous.target_stats
+    result.completed = previous.completed
+    result.error = previous.error
+
+def phase_cache_key(result):
+    return token_key(result.tokens) + ("|optimized" if result.optimize else "")
+
+def share_result(result):
+    # Only finished results go into the phase cache: from then on request
+    # threads only read them, so they need no lock.
+    finished = result.error is not None or result.completed == len(PHASES) - 1
+    if PHASE_CACHE_ENABLED and finished and result.tokens is not None:
+        phase_cache.put(phase_cache_key(result), result, PHASE_CACHE_BYTES_PER_TOKEN * len(result.tokens))
+
+def stored_result(source_code, optimize=False):
+    """The artifact cache's result for source_code, or None."""
+    return artifact_cache.load(source_code, optimize) if artifact_cache is not None else None
+
+def cached_result(source_code, optimize=False):
+    result = stored_result(source_code, optimize)
+    if result is not None:
+        return result
+    result = CompilationResult(source_code, optimize=optimize)
+    if PHASE_CACHE_ENABLED and result.run('tokens'):
+        previous = phase_cache.get(phase_cache_key(result))
+        if previous is None:
+            result.run()
+            share_result(result)
         else:
-            raise RuntimeError("Unknown node type in code generation.")
+            reuse_phases(result, previous)
+    return result
 
-    for ast in ast_list:
-        result = generate(ast['expression'])
-        code_lines.append(f"{ast['target']} = {result}")
-    return "\n".join(code_lines)
+def store_artifact(result):
+    # Only results whose pipeline has finished are written; see ArtifactCache.store.
+    if artifact_cache is not None:
+        artifact_cache.store(result)
 
-# ------------------------
-# Code Generation (Target Code)
-# ------------------------
-def code_generation(intermediate_code):
-    assembly_lines = []
-    lines = intermediate_code.splitlines()
-    for line in lines:
-        if '=' in line:
-            lhs, rhs = line.split('=')
-            lhs = lhs.strip()
-            rhs = rhs.strip()
-            if re.fullmatch(r'\d+(\.\d+)?', rhs):
-                assembly_lines.append(f"LOAD_CONST R1, {rhs}")
-                assembly_lines.append(f"STORE R1, {lhs}")
-            else:
-                assembly_lines.append(f"// Computed: {rhs} stored in {lhs}")
-    return "\n".join(assembly_lines)
+def build_payload(result, phases=None):
+    """The /compile response body for a result and its rough size in bytes."""
+    if phases:
+        sections = result.sections(phases)
+        error = str(result.error) if result.error is not None else None
+        payload = {"sections": sections, "error": error}
+        size = sum(len(text) for text in sections.values() if text) + len(error or "")
+    else:
+        payload = {"output": result.render()}
+        size = len(payload["output"])
+    return payload, size
 
-# ------------------------
-# Compiler Simulator (Combined)
-# ------------------------
-def compile_source(source_code):
-    output_lines = []
-    output_lines.append("Source Code:")
-    output_lines.append(source_code)
-    try:
-        tokens = lexical_analysis(source_code)
-        output_lines.append("\n[Lexical Analysis Output]")
-        for token in tokens:
-            output_lines.append(str(token))
-        ast_list = syntax_analysis(tokens)
-        output_lines.append("\n[Syntax Analysis Output (ASTs)]")
-        for ast in ast_list:
-            output_lines.append(str(ast))
-        ast_list = semantic_analysis(ast_list)
-        output_lines.append("\n[Semantic Analysis Output (ASTs with Semantic Info)]")
-        for ast in ast_list:
-            output_lines.append(str(ast))
-        interm_code = intermediate_code_generation(ast_list)
-        output_lines.append("\n[Intermediate Code]")
-        output_lines.append(interm_code)
-        target_code = code_generation(interm_code)
-        output_lines.append("\n[Target Code Generation]")
-        output_lines.append(target_code)
-    except (SyntaxError, RuntimeError) as e:
-        output_lines.append("\nError:")
-        output_lines.append(str(e))
-    return "\n".join(output_lines)
+def compile_cache_key(source_code, phases=None, optimize=False):
+    return source_key(source_code) + "|" + (",".join(phases) if phases else "output") + ("|optimized" if optimize else "")
+
+def cached_compile(source_code, phases=None, optimize=False):
+    """Build the /compile response body, either the full report or only the requested sections."""
+    key = compile_cache_key(source_code, phases, optimize)
+    payload = result_cache.get(key)
+    if payload is None:
+        result = cached_result(source_code, optimize)
+        payload, size = build_payload(result, phases)
+        store_artifact(result)
+        if result.metrics:
+            phase_metrics.record(result.metrics)
+        result_cache.put(key, payload, size)
+    return payload
+
+def profiled_compile(source_code, phases=None, optimize=False):
+    # Bypasses both caches so every phase really runs and is measured.
+    result = CompilationResult(source_code, optimize=optimize, profile=True)
+    payload, _ = build_payload(result, phases)
+    phase_metrics.record(result.metrics)
+    return dict(payload, metrics=result.metrics)
+
+def compile_arguments(source_code, values):
+    """Validate /compile parameters; returns ((source_code, phases, optimize, profile), None) or (None, error response)."""
+    if not source_code.strip():
+        return None, ({"error": "Please enter some source code."}, 400)
+    # Optional comma-separated subset of PHASES, e.g. phases=intermediate,target
+    phases = values.get("phases")
+    if phases is not None:
+        phases = [phase.strip() for phase in phases.split(",") if phase.strip()]
+        unknown = [phase for phase in phases if phase not in PHASES]
+        if unknown or not phases:
+            return None, ({"error": f"Unknown phases: {', '.join(unknown)}. Choose from {', '.join(PHASES)}."}, 400)
+    # optimize=1 runs the IR optimization passes and adds their report.
+    optimize = values.get("optimize", "").lower() in ("1", "true", "yes")
+    # profile=1 adds per-phase wall/CPU time, allocated bytes and item counts.
+    profile = values.get("profile", "").lower() in ("1", "true", "yes")
+    return (source_code, phases, optimize, profile), None
+
+def run_compile(source_code, phases=None, optimize=False, profile=False):
+    if profile:
+        return profiled_compile(source_code, phases, optimize)
+    return cached_compile(source_code, phases, optimize)
+
+def stream_lines(source_code, phases=None, optimize=False, profile=False):
+    """The NDJSON lines of a /compile/stream response, each made as soon as its piece of the report is ready.
+
+    The generator returns the result's metrics once it is exhausted."""
+    if profile:
+        result = CompilationResult(source_code, optimize=optimize, profile=True)
+    else:
+        # No phase cache lookup, which would have to lex (and on a miss,
+        # finish) the program before the first line. The result is shared
+        # through the phase cache once it has been streamed.
+        result = stored_result(source_code, optimize)
+        if result is None:
+            result = CompilationResult(source_code, optimize=optimize)
+    for phase, text in result.iter_chunks(phases or PHASES, STREAM_CHUNK_SIZE):
+        yield json.dumps({"phase": phase, "text": text}) + "\n"
+    if result.metrics:
+        phase_metrics.record(result.metrics)
+        if profile:
+            yield json.dumps({"metrics": result.metrics}) + "\n"
+    if not profile:
+        share_result(result)
+        store_artifact(result)
+    return result.metrics
 
 # ------------------------
 # Flask Routes
@@ -255,12 +261,57 @@ def compile_source(source_code):
 @app.route("/compile", methods=["GET", "POST"])
 def compile():
     if request.method == "POST":
-        source_code = request.form.get("source_code", "")
-        if not source_code.strip():
-            return {"error": "Please enter some source code."}, 400
-        result = compile_source(source_code)
-        return {"output": result}, 200
+        arguments, error = compile_arguments(request.form.get("source_code", ""), request.values)
+        if error is not None:
+            return error
+        return run_compile(*arguments), 200
     return {"message": "Send a POST request with source_code to compile"}, 200
 
+@app.route("/compile/stream", methods=["POST"])
+def compile_stream():
+    # Same form fields as /compile. Streams one NDJSON line per piece of the
+    # report, {"phase": ..., "text": ...}, as soon as that phase has run; the
+    # texts of one phase concatenated give its section of the /compile
+    # output, headers included. A failed compile ends with phase "error".
+    # Sections are formatted piece by piece, so the report is never built
+    # as a whole.
+    arguments, error = compile_arguments(request.form.get("source_code", ""), request.values)
+    if error is not None:
+        return error
+    return Response(stream_with_context(stream_lines(*arguments)), mimetype="application/x-ndjson")
+
+@app.route("/compile/batch", methods=["POST"])
+def compile_batch():
+    # Body: {"sources": ["a = 1;", ...]}. Streams one NDJSON line per program,
+    # {"index": i, "output": ..., "error": ...}, in completion order.
+    data = request.get_json(silent=True) or {}
+    sources = data.get("sources")
+    if not isinstance(sources, list) or not all(isinstance(source, str) for source in sources):
+        return {"error": "Send a JSON body with a list of source strings in 'sources'."}, 400
+    if len(sources) > MAX_BATCH_SOURCES:
+        return {"error": f"A batch may contain at most {MAX_BATCH_SOURCES} sources."}, 413
+
+    # The batch machinery (and multiprocessing) is only loaded once a batch arrives.
+    from compiler.batch_compilation import iter_compile_many
+
+    def generate():
+        for index, item in iter_compile_many(sources, executor=get_batch_executor(), cache_path=ARTIFACT_CACHE_PATH):
+            yield json.dumps({"index": index, **item}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    stats = {"result_cache": result_cache.stats(), "phase_cache": phase_cache.stats()}
+    if artifact_cache is not None:
+        stats["artifact_cache"] = artifact_cache.stats()
+    return stats, 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text exposition format, fed by profiled and sampled compiles.
+    return Response(phase_metrics.render(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Development server only; see asgi.py for serving under load.
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get("FLASK_DEBUG") == "1")
\ No newline at end of file
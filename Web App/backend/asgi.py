@@ -0,0 +1,391 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from urllib.parse import parse_qsl
+
+from app import (app as flask_app, build_payload, cached_result, compile_arguments, compile_cache_key,
+                 phase_metrics, result_cache, store_artifact, stream_lines, ARTIFACT_CACHE_PATH, MAX_BATCH_SOURCES)
+from compiler import CompilationResult
+from compiler.batch_compilation import compile_item, failed_item
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:
+    WsgiToAsgi = None
+
+# ------------------------
+# ASGI Serving
+# ------------------------
+# Run with any ASGI server, e.g.
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000
+# POST /compile, /compile/stream and /compile/batch are handled here: the
+# event loop only parses the request and answers cache hits, and every
+# compile runs on a bounded process pool with a CPU time limit. At most
+# COMPILE_WORKERS + MAX_QUEUED_COMPILES requests are admitted at once;
+# beyond that requests get 429 straight away instead of piling up. A batch
+# counts as one request and keeps at most COMPILE_WORKERS chunks on the
+# pool. Streamed lines come back from the pool through a manager queue.
+# Every other route is passed through to the Flask app (needs asgiref).
+COMPILE_WORKERS = os.cpu_count() or 1
+MAX_QUEUED_COMPILES = 4 * COMPILE_WORKERS
+MAX_REQUEST_BYTES = 256 * 1024
+MAX_BATCH_REQUEST_BYTES = 16 * 1024 * 1024
+BATCH_CHUNK_SIZE = 32
+COMPILE_CPU_SECONDS = 5.0
+RETRY_AFTER_SECONDS = 1
+STREAM_POLL_SECONDS = 0.5
+
+# A BaseException, so that handlers for Exception (such as compile_item's)
+# do not swallow it.
+class CPULimitExceeded(BaseException):
+    pass
+
+def raise_cpu_limit(signum, frame):
+    raise CPULimitExceeded()
+
+def cpu_limit_error(cpu_seconds):
+    return f"Compilation exceeded the CPU time limit of {cpu_seconds:g} seconds."
+
+@contextmanager
+def cpu_limit(cpu_seconds):
+    # ITIMER_PROF counts this process's CPU time, so time spent waiting in the
+    # queue is not charged. Without setitimer (Windows) there is no limit.
+    limited = hasattr(signal, 'setitimer')
+    if limited:
+        signal.signal(signal.SIGPROF, raise_cpu_limit)
+        signal.setitimer(signal.ITIMER_PROF, cpu_seconds)
+    try:
+        yield
+    finally:
+        if limited:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+
+def compile_in_worker(source_code, phases, optimize, profile, cpu_seconds):
+    """Runs in a pool process; returns (payload, size, metrics), or None past the CPU limit."""
+    try:
+        with cpu_limit(cpu_seconds):
+            if profile:
+                result = CompilationResult(source_code, optimize=optimize, profile=True)
+            else:
+                result = cached_result(source_code, optimize)
+            payload, size = build_payload(result, phases)
+            if not profile:
+                store_artifact(result)
+            return payload, size, result.metrics
+    except CPULimitExceeded:
+        return None
+
+def stream_in_worker(source_code, phases, optimize, profile, cpu_seconds, lines):
+    """Runs in a pool process; puts each /compile/stream line on the lines queue, then None.
+
+    Returns the compile's metrics, which stream_lines records in this process only."""
+    generator = stream_lines(source_code, phases, optimize, profile)
+    try:
+        with cpu_limit(cpu_seconds):
+            while True:
+                try:
+                    lines.put(next(generator))
+                except StopIteration as stop:
+                    return stop.value
+    except CPULimitExceeded:
+        lines.put(json.dumps({"phase": "error", "text": "\nError:\n" + cpu_limit_error(cpu_seconds)}) + "\n")
+        return None
+    finally:
+        lines.put(None)
+
+def batch_in_worker(start, sources, cpu_seconds, cache_path):
+    """Runs in a pool process; compiles each source under its own CPU limit into (index, item) pairs."""
+    items = []
+    for offset, source_code in enumerate(sources):
+        try:
+            with cpu_limit(cpu_seconds):
+                item = compile_item(source_code, cache_path=cache_path)
+        except CPULimitExceeded:
+            item = {'output': None, 'error': cpu_limit_error(cpu_seconds)}
+        items.append((start + offset, item))
+    return items
+
+compile_pool = None
+stream_manager = None
+in_flight = 0
+
+def get_compile_pool():
+    global compile_pool
+    if compile_pool is None:
+        compile_pool = ProcessPoolExecutor(max_workers=COMPILE_WORKERS)
+    return compile_pool
+
+def shutdown_compile_pool():
+    global compile_pool
+    if compile_pool is not None:
+        compile_pool.shutdown(cancel_futures=True)
+        compile_pool = None
+
+def get_stream_manager():
+    # Queues of a manager, unlike multiprocessing.Queue, can be passed to pool tasks.
+    global stream_manager
+    if stream_manager is None:
+        stream_manager = multiprocessing.Manager()
+    return stream_manager
+
+def shutdown_stream_manager():
+    global stream_manager
+    if stream_manager is not None:
+        stream_manager.shutdown()
+        stream_manager = None
+
+def busy_headers():
+    return [(b'retry-after', str(RETRY_AFTER_SECONDS).encode())]
+
+async def send_json(send, status, body, headers=()):
+    data = json.dumps(body).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(data)).encode()),
+            (b'access-control-allow-origin', b'*'),
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': data})
+
+async def read_body(receive, limit):
+    """The whole request body, or None once it grows past limit bytes."""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+async def read_request(scope, receive, send, content_type, limit):
+    """The body of a POST, or None after answering a wrong type or a body over limit bytes."""
+    headers = dict(scope['headers'])
+    too_large = {"error": f"Request body is larger than {limit} bytes."}
+    length = headers.get(b'content-length')
+    if length is not None and length.isdigit() and int(length) > limit:
+        await send_json(send, 413, too_large)
+        return None
+    if headers.get(b'content-type', b'').split(b';')[0].strip().lower() != content_type:
+        kind = "an application/x-www-form-urlencoded form" if content_type.endswith(b'urlencoded') else "JSON"
+        await send_json(send, 415, {"error": f"Send the request body as {kind}."})
+        return None
+    body = await read_body(receive, limit)
+    if body is None:
+        await send_json(send, 413, too_large)
+    return body
+
+async def read_compile_form(scope, receive, send):
+    """The compile_arguments of a /compile or /compile/stream POST, or None after answering an error."""
+    body = await read_request(scope, receive, send, b'application/x-www-form-urlencoded', MAX_REQUEST_BYTES)
+    if body is None:
+        return None
+    # Same lookup order as Flask's request.values: query string, then form.
+    values = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+    form = dict(parse_qsl(body.decode('utf-8', 'replace'), keep_blank_values=True))
+    values.update(form)
+    arguments, error = compile_arguments(form.get("source_code", ""), values)
+    if error is not None:
+        await send_json(send, error[1], error[0])
+        return None
+    return arguments
+
+def admitted():
+    return in_flight < COMPILE_WORKERS + MAX_QUEUED_COMPILES
+
+async def compile_endpoint(scope, receive, send):
+    global in_flight
+    if scope['method'] == 'GET':
+        return await send_json(send, 200, {"message": "Send a POST request with source_code to compile"})
+    if scope['method'] != 'POST':
+        return await send_json(send, 405, {"error": "Method not allowed."}, [(b'allow', b'GET, POST')])
+    arguments = await read_compile_form(scope, receive, send)
+    if arguments is None:
+        return
+    source_code, phases, optimize, profile = arguments
+
+    key = compile_cache_key(source_code, phases, optimize)
+    if not profile:
+        payload = result_cache.get(key)
+        if payload is not None:
+            return await send_json(send, 200, payload)
+
+    if not admitted():
+        return await send_json(send, 429, {"error": "The compiler is busy, try again shortly."}, busy_headers())
+    in_flight += 1
+    try:
+        outcome = await asyncio.get_running_loop().run_in_executor(
+            get_compile_pool(), compile_in_worker, source_code, phases, optimize, profile, COMPILE_CPU_SECONDS)
+    except CPULimitExceeded:
+        # The timer went off after the compile finished but before it was disarmed.
+        outcome = None
+    except BrokenProcessPool:
+        shutdown_compile_pool()
+        return await send_json(send, 503, {"error": "A compiler worker crashed, try again."}, busy_headers())
+    finally:
+        in_flight -= 1
+    if outcome is None:
+        return await send_json(send, 422, {"error": cpu_limit_error(COMPILE_CPU_SECONDS)})
+
+    payload, size, metrics = outcome
+    if metrics:
+        phase_metrics.record(metrics)
+    if profile:
+        payload = dict(payload, metrics=metrics)
+    else:
+        result_cache.put(key, payload, size)
+    await send_json(send, 200, payload)
+
+async def start_ndjson(send):
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'application/x-ndjson'), (b'access-control-allow-origin', b'*')],
+    })
+
+async def send_line(send, line):
+    await send({'type': 'http.response.body', 'body': line.encode(), 'more_body': True})
+
+async def stream_endpoint(scope, receive, send):
+    # The response starts with the first line the worker produces, so a
+    # worker that crashes before that still gets a 503.
+    global in_flight
+    if scope['method'] != 'POST':
+        return await send_json(send, 405, {"error": "Method not allowed."}, [(b'allow', b'POST')])
+    arguments = await read_compile_form(scope, receive, send)
+    if arguments is None:
+        return
+    if not admitted():
+        return await send_json(send, 429, {"error": "The compiler is busy, try again shortly."}, busy_headers())
+    in_flight += 1
+    loop = asyncio.get_running_loop()
+    started = False
+    try:
+        lines = get_stream_manager().Queue()
+        worker = loop.run_in_executor(get_compile_pool(), stream_in_worker, *arguments, COMPILE_CPU_SECONDS, lines)
+        while True:
+            try:
+                line = await loop.run_in_executor(None, lines.get, True, STREAM_POLL_SECONDS)
+            except queue.Empty:
+                if worker.done():
+                    break
+                continue
+            if line is None:
+                break
+            if not started:
+                await start_ndjson(send)
+                started = True
+            await send_line(send, line)
+        metrics = await worker
+        if metrics:
+            phase_metrics.record(metrics)
+    except BrokenProcessPool:
+        shutdown_compile_pool()
+        if not started:
+            return await send_json(send, 503, {"error": "A compiler worker crashed, try again."}, busy_headers())
+        await send_line(send, json.dumps({"phase": "error", "text": "\nError:\nA compiler worker crashed."}) + "\n")
+    finally:
+        in_flight -= 1
+    if not started:
+        await start_ndjson(send)
+    await send({'type': 'http.response.body', 'body': b''})
+
+async def batch_endpoint(scope, receive, send):
+    # Body: {"sources": ["a = 1;", ...]}, as for the Flask route. Lines go out
+    # in completion order as each chunk of BATCH_CHUNK_SIZE sources finishes.
+    global in_flight
+    if scope['method'] != 'POST':
+        return await send_json(send, 405, {"error": "Method not allowed."}, [(b'allow', b'POST')])
+    body = await read_request(scope, receive, send, b'application/json', MAX_BATCH_REQUEST_BYTES)
+    if body is None:
+        return
+    try:
+        sources = json.loads(body).get("sources")
+    except (ValueError, AttributeError):
+        sources = None
+    if not isinstance(sources, list) or not all(isinstance(source, str) for source in sources):
+        return await send_json(send, 400, {"error": "Send a JSON body with a list of source strings in 'sources'."})
+    if len(sources) > MAX_BATCH_SOURCES:
+        return await send_json(send, 413, {"error": f"A batch may contain at most {MAX_BATCH_SOURCES} sources."})
+    if any(len(source.encode('utf-8', 'surrogatepass')) > MAX_REQUEST_BYTES for source in sources):
+        return await send_json(send, 413, {"error": f"Every source must be at most {MAX_REQUEST_BYTES} bytes."})
+    if not admitted():
+        return await send_json(send, 429, {"error": "The compiler is busy, try again shortly."}, busy_headers())
+
+    in_flight += 1
+    loop = asyncio.get_running_loop()
+    try:
+        await start_ndjson(send)
+        starts = iter(range(0, len(sources), BATCH_CHUNK_SIZE))
+        running = {}
+        while True:
+            while len(running) < COMPILE_WORKERS:
+                start = next(starts, None)
+                if start is None:
+                    break
+                chunk = sources[start:start + BATCH_CHUNK_SIZE]
+                future = loop.run_in_executor(get_compile_pool(), batch_in_worker, start, chunk, COMPILE_CPU_SECONDS,
+                                              ARTIFACT_CACHE_PATH)
+                running[future] = (start, len(chunk))
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                start, count = running.pop(future)
+                try:
+                    items = future.result()
+                except Exception as e:
+                    # As in iter_compile_many, a crashed worker only fails its own chunk.
+                    if isinstance(e, BrokenProcessPool):
+                        shutdown_compile_pool()
+                    error = failed_item(e)
+                    items = [(start + offset, error) for offset in range(count)]
+                for index, item in items:
+                    await send_line(send, json.dumps({"index": index, **item}) + "\n")
+    finally:
+        in_flight -= 1
+    await send({'type': 'http.response.body', 'body': b''})
+
+endpoints = {'/compile': compile_endpoint, '/compile/stream': stream_endpoint, '/compile/batch': batch_endpoint}
+flask_asgi = WsgiToAsgi(flask_app) if WsgiToAsgi is not None else None
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            get_compile_pool()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            shutdown_compile_pool()
+            shutdown_stream_manager()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] == 'http' and scope['path'] in endpoints:
+        return await endpoints[scope['path']](scope, receive, send)
+    if flask_asgi is not None:
+        return await flask_asgi(scope, receive, send)
+    if scope['type'] == 'http':
+        await send_json(send, 404, {"error": "Not found. Install asgiref to serve the other routes under ASGI."})
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(application, host='0.0.0.0', port=5000)
@@ -0,0 +1,132 @@
+import argparse
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+# ------------------------
+# Load Test
+# ------------------------
+# Start the server first, e.g. `uvicorn asgi:application --port 5000`, then:
+#   python load_test.py --concurrency 32 --duration 20
+# Each client thread keeps one connection open and posts to /compile back to
+# back. Prints requests/sec, p50/p90/p99 latency of the successful requests
+# and a count per status code (429 means the server shed load).
+def generate_source(rng, statements):
+    names = ['x', 'y', 'z']
+    lines = []
+    for index in range(statements):
+        target = f"v{index % 16}"
+        terms = [rng.choice(names) if rng.random() < 0.6 else str(rng.randint(1, 99)) for _ in range(4)]
+        operators = [rng.choice('+-*') for _ in range(3)]
+        expression = terms[0] + ''.join(f" {operator} {term}" for operator, term in zip(operators, terms[1:]))
+        lines.append(f"{target} = {expression};")
+        if target not in names:
+            names.append(target)
+    return "\n".join(lines)
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    # Nearest-rank: the smallest value with at least `fraction` of the values at or below it.
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+def client(url, bodies, deadline, results, lock):
+    parts = urlsplit(url)
+    connection = None
+    latencies = []
+    statuses = Counter()
+    while time.perf_counter() < deadline:
+        body = random.choice(bodies)
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+            connection.request('POST', parts.path or '/', body,
+                               {'Content-Type': 'application/x-www-form-urlencoded'})
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            status = 'error'
+            if connection is not None:
+                connection.close()
+            connection = None
+        elapsed = time.perf_counter() - start
+        statuses[status] += 1
+        if status == 200:
+            latencies.append(elapsed)
+        elif status == 429:
+            time.sleep(0.05)
+    if connection is not None:
+        connection.close()
+    with lock:
+        results['latencies'].extend(latencies)
+        results['statuses'].update(statuses)
+
+def run(url, concurrency, duration, bodies):
+    results = {'latencies': [], 'statuses': Counter()}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [threading.Thread(target=client, args=(url, bodies, deadline, results, lock))
+               for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(results['latencies'])
+    total = sum(results['statuses'].values())
+    return {
+        'seconds': elapsed,
+        'requests': total,
+        'requests_per_second': total / elapsed,
+        'successes_per_second': len(latencies) / elapsed,
+        'p50': percentile(latencies, 0.50),
+        'p90': percentile(latencies, 0.90),
+        'p99': percentile(latencies, 0.99),
+        'statuses': {str(status): count for status, count in sorted(results['statuses'].items(), key=str)},
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the /compile endpoint.")
+    parser.add_argument('--url', default='http://127.0.0.1:5000/compile')
+    parser.add_argument('--concurrency', type=int, default=16, help="client threads, one connection each")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run")
+    parser.add_argument('--statements', type=int, default=200, help="statements per generated program")
+    parser.add_argument('--programs', type=int, default=50,
+                        help="distinct programs to send; fewer programs means more cache hits")
+    parser.add_argument('--phases', help="forwarded as the phases parameter")
+    parser.add_argument('--optimize', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    bodies = []
+    for _ in range(args.programs):
+        fields = {'source_code': generate_source(rng, args.statements)}
+        if args.phases:
+            fields['phases'] = args.phases
+        if args.optimize:
+            fields['optimize'] = '1'
+        bodies.append(urlencode(fields))
+
+    summary = run(args.url, args.concurrency, args.duration, bodies)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{summary['requests']} requests in {summary['seconds']:.1f}s: "
+          f"{summary['requests_per_second']:.1f} req/s, {summary['successes_per_second']:.1f} ok/s")
+    if summary['p50'] is not None:
+        print(f"latency p50 {summary['p50'] * 1000:.1f} ms, p90 {summary['p90'] * 1000:.1f} ms, "
+              f"p99 {summary['p99'] * 1000:.1f} ms")
+    print("status codes: " + ", ".join(f"{status}: {count}" for status, count in summary['statuses'].items()))
+
+if __name__ == "__main__":
+    main()
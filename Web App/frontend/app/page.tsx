@@ -3,67 +3,96 @@
 import { useState } from 'react';
 import './globals.css';
 
+type Section = {
+  phase: string;
+  text: string;
+};
+
 export default function Home() {
   const [sourceCode, setSourceCode] = useState('');
-  const [output, setOutput] = useState('');
+  const [sections, setSections] = useState<Section[]>([]);
   const [loading, setLoading] = useState(false);
 
+  // Each streamed line carries a piece of one phase's section. Pieces of the
+  // same phase arrive one after another, so they extend the last section.
+  const appendPiece = (phase: string, text: string) => {
+    setSections((previous) => {
+      const last = previous[previous.length - 1];
+      if (last && last.phase === phase) {
+        return [...previous.slice(0, -1), { phase, text: last.text + text }];
+      }
+      return [...previous, { phase, text }];
+    });
+  };
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setLoading(true);
+    setSections([]);
     try {
-      const response = await fetch('http://127.0.0.1:5000/compile', {
+      const response = await fetch('http://127.0.0.1:5000/compile/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/x-www-form-urlencoded',
         },
         body: new URLSearchParams({ source_code: sourceCode }),
       });
-      if (!response.ok) {
-        throw new Error('Failed to compile');
+      if (!response.ok || !response.body) {
+        const result = await response.json().catch(() => null);
+        throw new Error(result?.error || 'Failed to compile');
+      }
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        buffered += decoder.decode(value, { stream: !done });
+        const lines = buffered.split('\n');
+        buffered = lines.pop() ?? '';
+        for (const line of lines) {
+          if (!line) continue;
+          const piece = JSON.parse(line);
+          if (piece.phase) {
+            appendPiece(piece.phase, piece.text);
+          }
+        }
+        if (done) break;
       }
-      const result = await response.json();
-      setOutput(result.output);
     } catch (error) {
       const errorMessage = error instanceof Error ? error.message : 'An unknown error occurred';
-      setOutput(`Error: ${errorMessage}`);
+      appendPiece('error', `Error:\n${errorMessage}`);
     }
     setLoading(false);
   };
 
-  const formatOutput = (outputText: string) => {
-    if (!outputText) return null;
+  const formatSection = (section: Section) => {
+    const lines = section.text.replace(/^\n+/, '').split('\n');
+    const header = lines[0].match(/^\[(.+)\]$/) || lines[0].startsWith('Source Code') || lines[0].startsWith('Error:');
+    const title = header ? (header[1] || lines[0]) : null;
+    const content = title ? lines.slice(1) : lines;
 
-    const sections = outputText.split('\n\n').filter(Boolean);
-    return sections.map((section, index) => {
-      const lines = section.split('\n');
-      const header = lines[0].match(/^\[(.+)\]$/) || lines[0].startsWith('Source Code') || lines[0].startsWith('Error:');
-      const title = header ? (header[1] || lines[0]) : null;
-      const content = title ? lines.slice(1) : lines;
-
-      return (
-        <div
-          key={index}
-          className="mb-6 transform transition-all duration-300 hover:scale-105 hover:shadow-xl"
-        >
-          {title && (
-            <h3 className="text-lg font-semibold text-gray-100 bg-gradient-to-r from-gray-800 to-gray-700 px-4 py-2 rounded-t-md border-b border-gray-600">
-              {title}
-            </h3>
-          )}
-          <pre className="bg-gray-900 text-gray-200 p-4 rounded-b-md overflow-x-auto whitespace-pre-wrap border border-gray-700">
-            {content.map((line, i) => (
-              <div
-                key={i}
-                className="text-sm transition-colors duration-200 hover:text-blue-300"
-              >
-                {line}
-              </div>
-            ))}
-          </pre>
-        </div>
-      );
-    });
+    return (
+      <div
+        key={section.phase}
+        className="mb-6 transform transition-all duration-300 hover:scale-105 hover:shadow-xl"
+      >
+        {title && (
+          <h3 className="text-lg font-semibold text-gray-100 bg-gradient-to-r from-gray-800 to-gray-700 px-4 py-2 rounded-t-md border-b border-gray-600">
+            {title}
+          </h3>
+        )}
+        <pre className="bg-gray-900 text-gray-200 p-4 rounded-b-md overflow-x-auto whitespace-pre-wrap border border-gray-700">
+          {content.map((line, i) => (
+            <div
+              key={i}
+              className="text-sm transition-colors duration-200 hover:text-blue-300"
+            >
+              {line}
+            </div>
+          ))}
+        </pre>
+      </div>
+    );
   };
 
   return (
@@ -129,13 +158,13 @@ export default function Home() {
           </button>
         </form>
 
-        {output && (
+        {sections.length > 0 && (
           <div className="mt-10 animate-fade-in-up">
             <h2 className="text-2xl font-bold text-gray-800 mb-6 border-b-2 border-blue-500 pb-2">
               Compiler Output
             </h2>
             <div className="bg-gray-900 text-white p-6 rounded-lg shadow-inner">
-              {formatOutput(output)}
+              {sections.map(formatSection)}
             </div>
           </div>
         )}
@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_vm import generate_program, same_values
+from compiler.lexical_analysis import tokenize
+from compiler.syntax_analysis import syntax_analysis
+from compiler.semantic_analysis import semantic_analysis
+from compiler.intermediate_code_generation import generate_instructions
+from compiler.bytecode_vm import compile_bytecode, run_bytecode
+from compiler.expression_dag import NodeFactory, fold_shared, generate_shared, dag_stats
+
+# ------------------------
+# Expression DAG Benchmark
+# ------------------------
+# Run from the repository root:  python benchmarks/bench_dag.py
+# Compares the parser's trees with the hash-consed DAG on a program that
+# keeps reusing a few subexpressions such as (a+b)*(c-d) and reassigns
+# their inputs now and then, and on the random programs of bench_vm, which
+# share almost nothing. "AST KB" is the memory still held by the parsed
+# statements.
+SHARED_TERMS = ['(a + b) * (c - d)', '(a + b)', '(c - d) / (a + 1)', '(a * b - c * d)']
+
+def generate_repetitive_program(statements, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    previous = 'a'
+    for index in range(statements):
+        if index % 50 == 49:
+            lines.append(f"{rng.choice('abcd')} = {previous} / 1000;")
+            continue
+        terms = [rng.choice(SHARED_TERMS) for _ in range(rng.randint(2, 4))]
+        expression = f" {rng.choice('+-*')} ".join(terms)
+        lines.append(f"v{index} = ({expression}) * {previous} / 1000;")
+        previous = f"v{index}"
+    return "\n".join(lines), ['a', 'b', 'c', 'd']
+
+def parse(source, factory=None):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ast_list = syntax_analysis(tokenize(source), factory)
+    seconds = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return ast_list, seconds, memory
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    print(f"{'program':>16} {'nodes':>8} {'unique':>8} {'AST KB':>8} {'DAG KB':>8} {'fold s':>8} {'shared s':>9} "
+          f"{'IR':>7} {'shared IR':>10} {'gen s':>8} {'shared s':>9}")
+    programs = [(f"repetitive {n}", generate_repetitive_program(n)) for n in (1000, 5000)]
+    programs += [(f"random {n}", generate_program(n)) for n in (1000, 5000)]
+    for label, (source, names) in programs:
+        inputs = {name: 1.5 + index for index, name in enumerate(names)}
+        tree_list, _, tree_memory = parse(source)
+        factory = NodeFactory()
+        dag_list, _, dag_memory = parse(source, factory)
+        stats = dag_stats(dag_list)
+
+        folded, fold_time = timed(semantic_analysis, tree_list)
+        shared_folded, shared_fold_time = timed(fold_shared, dag_list, factory)
+        instructions, generate_time = timed(generate_instructions, folded)
+        shared_instructions, shared_generate_time = timed(generate_shared, shared_folded)
+        assert same_values(run_bytecode(compile_bytecode(shared_instructions), inputs),
+                           run_bytecode(compile_bytecode(instructions), inputs))
+        print(f"{label:>16} {stats['total_nodes']:>8} {stats['unique_nodes']:>8} {tree_memory / 1024:>8.0f} "
+              f"{dag_memory / 1024:>8.0f} {fold_time:>8.4f} {shared_fold_time:>9.4f} {len(instructions):>7} "
+              f"{len(shared_instructions):>10} {generate_time:>8.4f} {shared_generate_time:>9.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiler.lexical_analysis import tokenize
+from compiler.syntax_analysis import syntax_analysis
+from compiler.semantic_analysis import semantic_analysis
+from compiler.intermediate_code_generation import intermediate_code_generation
+from compiler.compile_source import compile_source
+
+# ------------------------
+# Deep Expression Stress Benchmark
+# ------------------------
+# Run from the repository root:  python benchmarks/bench_deep_expressions.py
+# Each case is timed at two sizes; with the iterative parser and walkers the
+# time per token should stay flat as the size grows.
+
+def nested_parentheses(depth):
+    # x = (((...(a + 1) + 1)...) + 1);
+    return "x = " + "(" * depth + "a" + " + 1)" * depth + ";"
+
+def right_nested(depth):
+    # x = a + (a + (a + ... (a + 1)));
+    return "x = " + "a + (" * depth + "1" + ")" * depth + ";"
+
+def long_chain(length):
+    # x = a + 1 - a * 2 + ... (one long left-associative chain)
+    ops = ['+', '-', '*', '/']
+    terms = [f"a {ops[i % 4]} {i + 1}" for i in range(length)]
+    return "x = " + " + ".join(terms) + ";"
+
+def constant_chain(length):
+    # Entirely foldable, exercises constant folding on a deep tree.
+    return "x = " + " + ".join(str(i + 1) for i in range(length)) + ";"
+
+CASES = [
+    ("nested parentheses", nested_parentheses, (5000, 50000)),
+    ("right-nested sums", right_nested, (5000, 50000)),
+    ("long chain", long_chain, (20000, 200000)),
+    ("constant chain", constant_chain, (20000, 200000)),
+]
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run_case(name, build, size):
+    source = build(size)
+    tokens, lex_time = timed(tokenize, source)
+    ast_list, parse_time = timed(syntax_analysis, tokens)
+    ast_list, fold_time = timed(semantic_analysis, ast_list)
+    _, ir_time = timed(intermediate_code_generation, ast_list)
+    _, total_time = timed(compile_source, source)
+    per_token = total_time / len(tokens) * 1e6
+    print(f"{name:<20} {size:>8} {len(tokens):>9} {lex_time:>8.3f} {parse_time:>8.3f} "
+          f"{fold_time:>8.3f} {ir_time:>8.3f} {total_time:>8.3f} {per_token:>8.2f}")
+
+def main():
+    print(f"{'case':<20} {'size':>8} {'tokens':>9} {'lex s':>8} {'parse s':>8} "
+          f"{'fold s':>8} {'ir s':>8} {'total s':>8} {'us/tok':>8}")
+    for name, build, sizes in CASES:
+        for size in sizes:
+            run_case(name, build, size)
+
+if __name__ == "__main__":
+    main()
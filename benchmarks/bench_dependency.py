@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_vm import same_values, best_of
+from compiler.lexical_analysis import tokenize
+from compiler.syntax_analysis import syntax_analysis
+from compiler.semantic_analysis import semantic_analysis
+from compiler.intermediate_code_generation import generate_instructions
+from compiler.bytecode_vm import compile_bytecode, run_bytecode
+from compiler.dependency_graph import IncrementalEvaluator
+
+# ------------------------
+# Incremental Evaluation Benchmark
+# ------------------------
+# Run from the repository root:  python benchmarks/bench_dependency.py
+# A spreadsheet-like program: many inputs, each feeding a short block of
+# statements that also read a few shared constants and totals. Changing
+# one input should only cost its block, while the VM reruns everything.
+BLOCK_SIZE = 20
+
+def generate_program(statements, seed=7):
+    rng = random.Random(seed)
+    lines = ["rate = 3;", "scale = rate * 2 + 1;"]
+    inputs = []
+    for block in range(statements // BLOCK_SIZE):
+        name = f"x{block}"
+        inputs.append(name)
+        names = [name, 'rate', 'scale']
+        for index in range(BLOCK_SIZE):
+            target = f"b{block}_{index}"
+            expression = rng.choice(names[-4:])
+            for _ in range(rng.randint(1, 3)):
+                operand = rng.choice(names) if rng.random() < 0.7 else str(rng.randint(1, 9))
+                expression = f"({expression} {rng.choice('+-*')} {operand})"
+            lines.append(f"{target} = {expression};")
+            names.append(target)
+        # Overwritten before anything reads it, so it is dropped.
+        lines.append(f"{names[-1]} = {names[-2]} - {name};")
+    return "\n".join(lines), inputs
+
+def main():
+    print(f"{'statements':>10} {'kept':>7} {'vm s':>9} {'full s':>9} {'update s':>9} {'evaluated':>10} {'speedup':>8}")
+    for statements in (1000, 10000, 50000):
+        source, names = generate_program(statements)
+        inputs = {name: 1.5 + index for index, name in enumerate(names)}
+        ast_list = semantic_analysis(syntax_analysis(tokenize(source)))
+        bytecode = compile_bytecode(generate_instructions(ast_list))
+        evaluator = IncrementalEvaluator(ast_list)
+        _, vm_time = best_of(3, run_bytecode, bytecode, inputs)
+
+        def full_run():
+            evaluator.values = None
+            return evaluator.run(inputs)
+        _, full_time = best_of(3, full_run)
+
+        rng = random.Random(1)
+        update_time = 0.0
+        evaluated = 0
+        for _ in range(20):
+            name = rng.choice(names)
+            inputs[name] += 1
+            start = time.perf_counter()
+            evaluator.update({name: inputs[name]})
+            update_time += time.perf_counter() - start
+            evaluated += evaluator.evaluated
+        update_time /= 20
+        assert same_values(evaluator.variables(), run_bytecode(bytecode, inputs))
+        print(f"{len(ast_list):>10} {len(evaluator.graph):>7} {vm_time:>9.4f} {full_time:>9.4f} {update_time:>9.6f} "
+              f"{evaluated / 20:>10.1f} {vm_time / update_time:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
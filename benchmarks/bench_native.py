@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_vm import generate_program, interpret_dicts, same_values, best_of
+from compiler.lexical_analysis import tokenize
+from compiler.syntax_analysis import syntax_analysis
+from compiler.semantic_analysis import semantic_analysis
+from compiler.bytecode_vm import compile_bytecode, run_bytecode
+from compiler.intermediate_code_generation import generate_instructions
+from compiler.native_execution import lower_to_python, native_program
+
+# ------------------------
+# Native Execution Benchmark
+# ------------------------
+# Run from the repository root:  python benchmarks/bench_native.py
+# Compares the generated Python function against walking the to_dict() form
+# of the syntax_analysis ASTs (and the bytecode VM for reference). "lower s"
+# is the one-off cost of building the function from folded ASTs; "memo s"
+# is a repeated native_program() call for the same source.
+
+def main():
+    print(f"{'statements':>10} {'tree-walk s':>12} {'vm s':>10} {'native s':>10} {'lower s':>9} "
+          f"{'memo s':>9} {'vs walk':>8} {'vs vm':>7}")
+    for statements in (1000, 2000, 5000, 10000):
+        source, names = generate_program(statements)
+        inputs = {name: 1.5 + index for index, name in enumerate(names)}
+        ast_list = syntax_analysis(tokenize(source))
+        ast_dicts = [ast.to_dict() for ast in ast_list]
+        folded = semantic_analysis(ast_list)
+        bytecode = compile_bytecode(generate_instructions(folded))
+        program, lower_time = best_of(1, lower_to_python, folded)
+
+        expected, walk_time = best_of(3, interpret_dicts, ast_dicts, inputs)
+        vm_result, vm_time = best_of(3, run_bytecode, bytecode, inputs)
+        result, native_time = best_of(3, program, inputs)
+        assert same_values({**inputs, **result}, expected) and same_values(vm_result, expected)
+
+        native_program(source)
+        start = time.perf_counter()
+        native_program(source)
+        memo_time = time.perf_counter() - start
+        print(f"{statements:>10} {walk_time:>12.4f} {vm_time:>10.4f} {native_time:>10.4f} {lower_time:>9.4f} "
+              f"{memo_time:>9.6f} {walk_time / native_time:>7.1f}x {vm_time / native_time:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from program_generator import generate_program
+from compiler.compile_source import CompilationResult
+from compiler.parallel_compilation import compile_parallel
+
+# ------------------------
+# Parallel Compilation Benchmark
+# ------------------------
+# Run from the repository root:  python benchmarks/bench_parallel.py
+# Compiles and renders the full report of one large program, serially and
+# then with 1..N worker processes, and reports the speedup over the serial
+# compile. Only lexing, parsing, folding, IR generation and the sections of
+# those phases run in the workers; target code is still generated and
+# rendered serially. Pools are started (and warmed up) before timing, so
+# the numbers are the per-program cost a long-running server or CLI would
+# see.
+
+def render(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    report = result.render()
+    return report, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how compiling one program scales with worker processes.")
+    parser.add_argument('--statements', type=int, default=40000, help="size of the generated program")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help="largest pool to try")
+    parser.add_argument('--runs', type=int, default=3, help="best of this many runs per configuration")
+    args = parser.parse_args()
+
+    source = generate_program(statements=args.statements)
+    expected, serial_time = min((render(CompilationResult, source) for _ in range(args.runs)), key=lambda run: run[1])
+    print(f"{args.statements} statements, {len(source) / 1e6:.2f} MB, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'efficiency':>11}")
+    print(f"{'serial':>8} {serial_time:>9.3f} {1.0:>7.2f}x {'':>11}")
+    for workers in range(1, args.max_workers + 1):
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            compile_parallel("a = 1;", workers, executor, min_chunk_size=1)
+            best = float('inf')
+            for _ in range(args.runs):
+                # workers=1 would fall back to a serial compile, so one
+                # worker still gets its program cut into chunks here.
+                report, seconds = render(compile_parallel, source, max(workers, 2), executor, min_chunk_size=1)
+                best = min(best, seconds)
+        assert report == expected
+        print(f"{workers:>8} {best:>9.3f} {serial_time / best:>7.2f}x {serial_time / best / workers:>10.0%}")
+
+if __name__ == "__main__":
+    main()
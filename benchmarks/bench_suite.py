@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from compiler.compile_source import CompilationResult, PHASES
+from program_generator import generate_program
+
+# ------------------------
+# Benchmark Suite
+# ------------------------
+# Run from the repository root:
+#   python benchmarks/bench_suite.py --output results.json
+#   python benchmarks/bench_suite.py --baseline results.json
+# Times every phase of the compiler and the whole compile_source path on
+# generated programs and reports statements/sec and tokens/sec. With
+# --baseline, any timing more than --threshold slower than the saved run is
+# flagged and the exit status is 1. The exit status is also 1 when importing
+# the compiler in a fresh interpreter takes longer than --import-budget or
+# loads any of the modules that are meant to stay lazy.
+CASES = {
+    'small':          {'statements': 100,   'depth': 3,  'constant_ratio': 0.3},
+    'medium':         {'statements': 2000,  'depth': 4,  'constant_ratio': 0.3},
+    'large':          {'statements': 10000, 'depth': 4,  'constant_ratio': 0.3},
+    'deep':           {'statements': 200,   'depth': 12, 'constant_ratio': 0.3},
+    'constant_heavy': {'statements': 2000,  'depth': 4,  'constant_ratio': 0.8},
+    'chain':          {'statements': 20,    'depth': 2000, 'constant_ratio': 0.5},
+}
+
+DEFAULT_THRESHOLD = 0.15
+
+# What a web worker or the CLI imports before its first compile.
+IMPORT_STATEMENT = "from compiler import CompilationResult"
+IMPORT_BUDGET_SECONDS = 0.03
+LAZY_MODULES = ('compiler.optimization', 'compiler.bytecode_vm', 'compiler.vectorized_evaluation',
+                'compiler.batch_compilation', 'compiler.artifact_cache', 'numpy', 'multiprocessing', 'sqlite3',
+                'tracemalloc')
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+{IMPORT_STATEMENT}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules]}}))
+"""
+
+def measure_import(repeat):
+    """Best-of-repeat seconds to import the compiler, each in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], env=env, cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        sample = json.loads(output)
+        best = sample['seconds'] if best is None else min(best, sample['seconds'])
+        loaded = sample['loaded']
+    return {'statement': IMPORT_STATEMENT, 'seconds': best, 'eagerly_loaded': loaded}
+
+def measure_case(source, repeat, optimize):
+    """Best-of-repeat seconds for each phase, for rendering and for the whole pipeline."""
+    phases = [phase for phase in PHASES[1:] if optimize or phase != 'optimization']
+    best = {}
+    counts = None
+    for _ in range(repeat):
+        timings = {}
+        start = time.perf_counter()
+        result = CompilationResult(source, optimize=optimize, profile=False)
+        for phase in phases:
+            phase_start = time.perf_counter()
+            result.run(phase)
+            timings[phase] = time.perf_counter() - phase_start
+        render_start = time.perf_counter()
+        result.render()
+        timings['render'] = time.perf_counter() - render_start
+        timings['end_to_end'] = time.perf_counter() - start
+        if result.error is not None:
+            raise RuntimeError(f"Generated program failed to compile: {result.error}")
+        counts = {'statements': len(result.ast_list), 'tokens': len(result.tokens), 'bytes': len(source)}
+        for name, seconds in timings.items():
+            best[name] = min(best.get(name, seconds), seconds)
+    timings = {
+        name: {
+            'seconds': seconds,
+            'statements_per_second': counts['statements'] / seconds if seconds else None,
+            'tokens_per_second': counts['tokens'] / seconds if seconds else None,
+        }
+        for name, seconds in best.items()
+    }
+    return counts, timings
+
+def run_suite(case_names, seed, repeat, optimize):
+    results = {
+        'meta': {
+            'seed': seed,
+            'repeat': repeat,
+            'optimize': optimize,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'cases': {},
+    }
+    for name in case_names:
+        params = CASES[name]
+        source = generate_program(seed, **params)
+        counts, timings = measure_case(source, repeat, optimize)
+        results['cases'][name] = {'params': params, **counts, 'timings': timings}
+    results['import'] = measure_import(max(repeat, 5))
+    return results
+
+def compare(results, baseline, threshold):
+    """Return (regressions, lines) comparing each timing to the baseline's."""
+    regressions = []
+    lines = []
+    same_setup = all(baseline['meta'].get(key) == results['meta'][key] for key in ('seed', 'optimize'))
+    for name, case in results['cases'].items():
+        old = baseline.get('cases', {}).get(name)
+        if not same_setup or old is None or old.get('params') != case['params']:
+            lines.append(f"{name}: no comparable baseline")
+            continue
+        for timing, values in case['timings'].items():
+            before = old['timings'].get(timing, {}).get('seconds')
+            if not before:
+                continue
+            ratio = values['seconds'] / before
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  REGRESSION'
+                regressions.append((name, timing, ratio))
+            elif ratio < 1 - threshold:
+                flag = '  faster'
+            lines.append(f"{name:>15} {timing:>12} {before:>10.4f}s -> {values['seconds']:>10.4f}s  x{ratio:.2f}{flag}")
+    return regressions, lines
+
+def check_import(imports, budget):
+    """Return the problems with an import measurement; empty if it is within budget."""
+    problems = []
+    if imports['seconds'] > budget:
+        problems.append(f"`{imports['statement']}` took {imports['seconds'] * 1000:.1f} ms, "
+                        f"over the {budget * 1000:.0f} ms budget")
+    if imports['eagerly_loaded']:
+        problems.append(f"`{imports['statement']}` loaded {', '.join(imports['eagerly_loaded'])}")
+    return problems
+
+def print_results(results):
+    print(f"{'case':>15} {'phase':>12} {'seconds':>10} {'stmts/s':>12} {'tokens/s':>12}")
+    for name, case in results['cases'].items():
+        for timing, values in case['timings'].items():
+            print(f"{name:>15} {timing:>12} {values['seconds']:>10.4f} "
+                  f"{values['statements_per_second'] or 0:>12.0f} {values['tokens_per_second'] or 0:>12.0f}")
+    imports = results['import']
+    print(f"{'import':>15} {'compiler':>12} {imports['seconds']:>10.4f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the compiler phases on generated programs.")
+    parser.add_argument('--cases', default=','.join(CASES), help="comma-separated subset of: " + ', '.join(CASES))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per case; the fastest is kept")
+    parser.add_argument('--optimize', action='store_true', help="include the IR optimization phase")
+    parser.add_argument('--output', help="write the results to this JSON file (e.g. to use as a baseline)")
+    parser.add_argument('--baseline', help="compare against results saved earlier with --output")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="fractional slowdown that counts as a regression (default %(default)s)")
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_SECONDS,
+                        help="seconds allowed for importing the compiler (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    case_names = [name.strip() for name in args.cases.split(',') if name.strip()]
+    unknown = [name for name in case_names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    results = run_suite(case_names, args.seed, args.repeat, args.optimize)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    status = 0
+    import_problems = check_import(results['import'], args.import_budget)
+    if import_problems:
+        print()
+        print("\n".join(import_problems))
+        status = 1
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions, lines = compare(results, baseline, args.threshold)
+        print()
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} timing(s) regressed by more than {args.threshold:.0%}.")
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
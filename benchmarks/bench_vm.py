@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compiler.lexical_analysis import tokenize
+from compiler.syntax_analysis import syntax_analysis
+from compiler.bytecode_vm import compile_bytecode, run_bytecode
+from compiler.semantic_analysis import semantic_analysis
+from compiler.intermediate_code_generation import generate_instructions
+from compiler.optimization import optimize
+
+# ------------------------
+# Bytecode VM Benchmark
+# ------------------------
+# Run from the repository root:  python benchmarks/bench_vm.py
+# Compares running a program on the bytecode VM against the naive approach
+# of walking the to_dict() form of the syntax_analysis ASTs.
+
+def generate_program(statements, seed=7):
+    rng = random.Random(seed)
+    inputs = ['x', 'y', 'z']
+    names = list(inputs)
+    lines = []
+    for index in range(statements):
+        def operand():
+            return rng.choice(names) if rng.random() < 0.7 else str(rng.randint(1, 9))
+        expression = operand()
+        for _ in range(rng.randint(1, 4)):
+            expression = f"({expression} {rng.choice('+-*')} {operand()})"
+        target = f"v{index}"
+        lines.append(f"{target} = {expression};")
+        names.append(target)
+    return "\n".join(lines), inputs
+
+def evaluate_dict(node, env):
+    if node['type'] == 'number':
+        return node['value']
+    elif node['type'] == 'identifier':
+        return env[node['name']]
+    left = evaluate_dict(node['left'], env)
+    right = evaluate_dict(node['right'], env)
+    if node['operator'] == '+':
+        return left + right
+    elif node['operator'] == '-':
+        return left - right
+    elif node['operator'] == '*':
+        return left * right
+    return left / right
+
+def interpret_dicts(ast_dicts, inputs):
+    env = dict(inputs)
+    for statement in ast_dicts:
+        env[statement['target']] = evaluate_dict(statement['expression'], env)
+    return env
+
+def same_values(result, expected):
+    # Long multiply chains overflow to inf and nan, which never equals itself.
+    return all(result[name] == value or (value != value and result[name] != result[name])
+               for name, value in expected.items())
+
+def best_of(runs, func, *args):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    print(f"{'statements':>10} {'tree-walk s':>12} {'vm s':>10} {'vm+opt s':>10} {'speedup':>8} {'opt speedup':>12}")
+    for statements in (500, 1000, 2000):
+        source, names = generate_program(statements)
+        inputs = {name: 1.5 + index for index, name in enumerate(names)}
+        ast_list = syntax_analysis(tokenize(source))
+        ast_dicts = [ast.to_dict() for ast in ast_list]
+        instructions = generate_instructions(semantic_analysis(ast_list))
+        bytecode = compile_bytecode(instructions)
+        optimized = compile_bytecode(optimize(instructions)[0])
+
+        expected, walk_time = best_of(3, interpret_dicts, ast_dicts, inputs)
+        result, vm_time = best_of(3, run_bytecode, bytecode, inputs)
+        optimized_result, opt_time = best_of(3, run_bytecode, optimized, inputs)
+        assert same_values(result, expected) and same_values(optimized_result, expected)
+        print(f"{statements:>10} {walk_time:>12.4f} {vm_time:>10.4f} {opt_time:>10.4f} "
+              f"{walk_time / vm_time:>7.1f}x {walk_time / opt_time:>11.1f}x")
+
+if __name__ == "__main__":
+    main()
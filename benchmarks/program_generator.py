@@ -0,0 +1,61 @@
+import random
+
+# ------------------------
+# Synthetic Program Generator
+# ------------------------
+# Seeded, so the same arguments always give the same program. Expressions
+# are random trees up to `depth` operators deep whose leaves are constants
+# with probability constant_ratio and otherwise identifiers: a few free
+# inputs plus every variable assigned so far. A '/' always divides by an
+# identifier or a non-zero constant, so folding never hits a division by zero.
+OPERATORS = ('+', '-', '*', '/')
+FREE_INPUTS = ('x', 'y', 'z')
+
+def generate_expression(rng, depth, constant_ratio, names):
+    def leaf(nonzero=False):
+        if rng.random() < constant_ratio:
+            if rng.random() < 0.1:
+                return f"{rng.randint(0, 99)}.{rng.randint(1, 9)}"
+            return str(rng.randint(1 if nonzero else 0, 99))
+        return rng.choice(names)
+
+    def build(levels):
+        if levels == 0 or rng.random() < 0.25:
+            return leaf()
+        operator = rng.choice(OPERATORS)
+        left = build(levels - 1)
+        right = leaf(nonzero=True) if operator == '/' else build(levels - 1)
+        return f"({left} {operator} {right})"
+
+    if depth > 200:
+        # build() recurses once per level, so very deep programs get a
+        # left-leaning chain instead.
+        expression = leaf()
+        for _ in range(depth):
+            operator = rng.choice(OPERATORS)
+            expression = f"({expression} {operator} {leaf(nonzero=operator == '/')})"
+    else:
+        expression = build(depth)
+    return expression[1:-1] if expression.startswith('(') else expression
+
+def generate_program(seed=0, statements=None, size=None, depth=4, constant_ratio=0.3, variables=16):
+    """Return source text with one assignment per line.
+
+    Stops after `statements` statements, or once the text is at least `size`
+    characters long; with neither, 100 statements are generated. Targets
+    cycle through `variables` names so later statements read earlier ones.
+    """
+    if statements is None and size is None:
+        statements = 100
+    rng = random.Random(seed)
+    names = list(FREE_INPUTS)
+    lines = []
+    length = 0
+    while (statements is None or len(lines) < statements) and (size is None or length < size):
+        target = f"v{len(lines) % variables}"
+        line = f"{target} = {generate_expression(rng, depth, constant_ratio, names)};"
+        lines.append(line)
+        length += len(line) + 1
+        if target not in names:
+            names.append(target)
+    return "\n".join(lines)
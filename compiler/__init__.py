@@ -0,0 +1,53 @@
+import importlib
+
+# ------------------------
+# Package Exports
+# ------------------------
+# `import compiler` loads nothing else: each name below is imported from its
+# submodule the first time it is used, so a process that only compiles never
+# loads the optimizer, the bytecode VM or NumPy. Functions that share a name
+# with their submodule (compile_source, syntax_analysis, semantic_analysis)
+# are left out, because importing the submodule would replace them here.
+EXPORTS = {
+    'CompilationResult': 'compile_source',
+    'PHASES': 'compile_source',
+    'tokenize': 'lexical_analysis',
+    'generate_instructions': 'intermediate_code_generation',
+    'format_instructions': 'intermediate_code_generation',
+    'generate_machine_code': 'code_generation',
+    'format_machine_code': 'code_generation',
+    'DEFAULT_REGISTER_COUNT': 'code_generation',
+    'optimize': 'optimization',
+    'compile_bytecode': 'bytecode_vm',
+    'run_bytecode': 'bytecode_vm',
+    'execute_source': 'bytecode_vm',
+    'native_program': 'native_execution',
+    'execute_native': 'native_execution',
+    'evaluate_vectorized': 'vectorized_evaluation',
+    'vectorize_source': 'vectorized_evaluation',
+    'NodeFactory': 'expression_dag',
+    'DependencyGraph': 'dependency_graph',
+    'IncrementalEvaluator': 'dependency_graph',
+    'IncrementalCompiler': 'incremental_compilation',
+    'DirtyLines': 'incremental_compilation',
+    'compile_file': 'stream_compilation',
+    'ArtifactCache': 'artifact_cache',
+    'compile_many': 'batch_compilation',
+    'compile_parallel': 'parallel_compilation',
+    'iter_compile_many': 'batch_compilation',
+    'set_profile_sampling': 'instrumentation',
+    'MetricsRegistry': 'instrumentation',
+}
+
+__all__ = sorted(EXPORTS)
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,341 @@
+import hashlib
+import marshal
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+from .ast_nodes import Number, Identifier, BinaryOp, Assignment, NUMBER, IDENTIFIER
+from .code_generation import DEFAULT_REGISTER_COUNT
+from .compile_source import CompilationResult, PHASES
+from .intermediate_code_generation import Instruction, Temp
+from .lexical_analysis import TokenStream
+
+# ------------------------
+# Artifact Cache
+# ------------------------
+# Finished CompilationResults (tokens, ASTs, IR, optimized IR and target
+# code) persisted in a SQLite file, so that restarted processes and other
+# processes on the machine, web workers and the CLI alike, can reuse them.
+# Entries are keyed by the SHA-256 of the source, the options and the
+# compiler's own code, and stored as zlib-compressed marshal data: compact,
+# fast, and unlike pickle, loading it never runs code. When the entries
+# outgrow max_bytes the least recently used are evicted.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# A hit only rewrites its access time when the stored one is older than this,
+# so that reads are not all turned into writes.
+ACCESS_RESOLUTION_SECONDS = 60.0
+FORMAT_VERSION = 1
+
+def default_cache_path():
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get('COMPILER_ARTIFACT_CACHE') or os.path.join(root, 'compiler-simulator', 'artifacts.sqlite3')
+
+compiler_version = None
+
+def compiler_fingerprint():
+    """Hash of the compiler's own code and the marshal format; any change invalidates every entry."""
+    global compiler_version
+    if compiler_version is None:
+        digest = hashlib.sha256(f"{FORMAT_VERSION}|{marshal.version}|{sys.version_info[:2]}".encode())
+        package = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(package)):
+            if name.endswith('.py'):
+                with open(os.path.join(package, name), 'rb') as file:
+                    digest.update(name.encode() + b'\0' + file.read())
+        compiler_version = digest.hexdigest()
+    return compiler_version
+
+def artifact_key(source_code, optimize=False, register_count=DEFAULT_REGISTER_COUNT):
+    digest = hashlib.sha256(f"{compiler_fingerprint()}|{int(bool(optimize))}|{register_count}|".encode())
+    digest.update(source_code.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+# ASTs are flattened in prefix order into parallel tag/payload lists, and
+# instructions into an opcode list plus one (kind, value) pair per operand,
+# so that everything is made of lists, numbers and strings that marshal
+# stores directly. Both are rebuilt with explicit stacks, since trees from
+# deeply nested input are thousands of levels deep.
+OPERAND_NONE = 0
+OPERAND_TEMP = 1
+OPERAND_VALUE = 2
+
+def encode_ast_list(ast_list):
+    targets = []
+    tags = []
+    payloads = []
+    for ast in ast_list:
+        targets.append(ast.target)
+        stack = [ast.expression]
+        while stack:
+            node = stack.pop()
+            kind = node.kind
+            tags.append(kind)
+            if kind == NUMBER:
+                payloads.append(node.value)
+            elif kind == IDENTIFIER:
+                payloads.append(node.name)
+            else:
+                payloads.append(node.op)
+                stack.append(node.right)
+                stack.append(node.left)
+    return targets, array('B', tags).tobytes(), payloads
+
+def decode_ast_list(encoded):
+    targets, tags, payloads = encoded
+    intern = sys.intern
+    stack = []
+    # Walking the prefix order backwards, both operands of an operator are
+    # on the stack by the time it is reached, left on top.
+    for index in range(len(tags) - 1, -1, -1):
+        tag = tags[index]
+        if tag == NUMBER:
+            stack.append(Number(payloads[index]))
+        elif tag == IDENTIFIER:
+            stack.append(Identifier(intern(payloads[index])))
+        else:
+            left = stack.pop()
+            stack.append(BinaryOp(payloads[index], left, stack.pop()))
+    return [Assignment(intern(target), stack.pop()) for target in targets]
+
+def encode_instructions(instructions):
+    ops = array('B')
+    kinds = array('B')
+    values = []
+    for instruction in instructions:
+        ops.append(instruction.op)
+        for operand in (instruction.dest, instruction.src1, instruction.src2):
+            if operand is None:
+                kinds.append(OPERAND_NONE)
+                values.append(None)
+            elif isinstance(operand, Temp):
+                kinds.append(OPERAND_TEMP)
+                values.append(operand.number)
+            else:
+                kinds.append(OPERAND_VALUE)
+                values.append(operand)
+    return ops.tobytes(), kinds.tobytes(), values
+
+def decode_instructions(encoded):
+    ops, kinds, values = encoded
+    intern = sys.intern
+    temps = {}
+    operands = []
+    for kind, value in zip(kinds, values):
+        if kind == OPERAND_TEMP:
+            temp = temps.get(value)
+            if temp is None:
+                temp = temps[value] = Temp(value)
+            operands.append(temp)
+        elif kind == OPERAND_VALUE and isinstance(value, str):
+            operands.append(intern(value))
+        else:
+            operands.append(value)
+    return [Instruction(op, operands[3 * index], operands[3 * index + 1], operands[3 * index + 2])
+            for index, op in enumerate(ops)]
+
+def encode_tokens(tokens):
+    return tuple(column.tobytes() for column in (tokens.kinds, tokens.starts, tokens.ends, tokens.lines, tokens.columns))
+
+def decode_tokens(encoded, source_code):
+    tokens = TokenStream(source_code)
+    for name, data in zip(('kinds', 'starts', 'ends', 'lines', 'columns'), encoded):
+        getattr(tokens, name).frombytes(data)
+    return tokens
+
+def dump_result(result):
+    """Serialize a result whose pipeline has finished, successfully or not."""
+    error = None
+    if result.error is not None:
+        error = ('SyntaxError' if isinstance(result.error, SyntaxError) else 'RuntimeError', str(result.error))
+    completed = result.completed
+    shares_instructions = result.optimized_instructions is result.instructions
+    record = (
+        completed,
+        error,
+        encode_tokens(result.tokens) if completed >= PHASES.index('tokens') else None,
+        encode_ast_list(result.ast_list) if completed >= PHASES.index('syntax') else None,
+        encode_ast_list(result.folded_ast_list) if completed >= PHASES.index('semantic') else None,
+        encode_instructions(result.instructions) if completed >= PHASES.index('intermediate') else None,
+        None if shares_instructions or completed < PHASES.index('optimization') else encode_instructions(result.optimized_instructions),
+        result.optimization_report,
+        result.machine_code,
+        result.target_stats,
+    )
+    return zlib.compress(marshal.dumps(record), 1)
+
+def load_result(data, source_code, optimize=False, register_count=DEFAULT_REGISTER_COUNT):
+    (completed, error, tokens, ast_list, folded_ast_list, instructions, optimized_instructions,
+     optimization_report, machine_code, target_stats) = marshal.loads(zlib.decompress(data))
+    result = CompilationResult(source_code, register_count, optimize, profile=False)
+    result.completed = completed
+    if error is not None:
+        result.error = SyntaxError(error[1]) if error[0] == 'SyntaxError' else RuntimeError(error[1])
+    if tokens is not None:
+        result.tokens = decode_tokens(tokens, source_code)
+    if ast_list is not None:
+        result.ast_list = decode_ast_list(ast_list)
+    if folded_ast_list is not None:
+        result.folded_ast_list = decode_ast_list(folded_ast_list)
+    if instructions is not None:
+        result.instructions = decode_instructions(instructions)
+    if optimized_instructions is not None:
+        result.optimized_instructions = decode_instructions(optimized_instructions)
+    elif completed >= PHASES.index('optimization'):
+        result.optimized_instructions = result.instructions
+    result.optimization_report = optimization_report
+    result.machine_code = machine_code
+    result.target_stats = target_stats
+    return result
+
+class ArtifactCache:
+    """A size-bounded SQLite store of finished CompilationResults.
+
+    Safe to share between threads and between processes: every process
+    opens its own connection (also after a fork) and SQLite's WAL mode lets
+    readers run alongside the single writer.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.connection = None
+        self.pid = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def connect(self):
+        if self.connection is None or self.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS artifacts ("
+                               "key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed)")
+            connection.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)")
+            connection.execute("INSERT OR IGNORE INTO totals VALUES (0, 0)")
+            self.connection = connection
+            self.pid = os.getpid()
+        return self.connection
+
+    def load(self, source_code, optimize=False, register_count=DEFAULT_REGISTER_COUNT):
+        """The stored result for this source and these options, or None.
+
+        A store that can't be read (locked for too long, corrupt, on a full
+        disk) counts as a miss, here and in store(), so compiling still works.
+        """
+        key = artifact_key(source_code, optimize, register_count)
+        try:
+            with self.lock:
+                connection = self.connect()
+                row = connection.execute("SELECT data, accessed FROM artifacts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    now = time.time()
+                    if now - row[1] > ACCESS_RESOLUTION_SECONDS:
+                        connection.execute("UPDATE artifacts SET accessed = ? WHERE key = ?", (now, key))
+            result = None if row is None else load_result(row[0], source_code, optimize, register_count)
+        except (sqlite3.Error, OSError, ValueError, EOFError, TypeError, zlib.error):
+            result = None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def store(self, result):
+        """Persist a result if its pipeline has finished and it isn't stored yet; returns whether it was written."""
+        if result.error is None and result.completed < len(PHASES) - 1:
+            return False
+        key = artifact_key(result.source_code, result.optimize, result.register_count)
+        try:
+            with self.lock:
+                connection = self.connect()
+                if connection.execute("SELECT 1 FROM artifacts WHERE key = ?", (key,)).fetchone() is not None:
+                    return False
+            data = dump_result(result)
+            if len(data) > self.max_bytes:
+                return False
+            with self.lock:
+                connection = self.connect()
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    cursor = connection.execute("INSERT OR IGNORE INTO artifacts VALUES (?, ?, ?, ?)",
+                                                (key, data, len(data), time.time()))
+                    if cursor.rowcount:
+                        connection.execute("UPDATE totals SET bytes = bytes + ? WHERE id = 0", (len(data),))
+                        self.evict(connection)
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+        except (sqlite3.Error, OSError):
+            return False
+        return bool(cursor.rowcount)
+
+    def evict(self, connection):
+        # Drop least recently used entries until the store is back under 90%
+        # of max_bytes, so that eviction doesn't run again on the next store.
+        total = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        goal = self.max_bytes * 0.9
+        while total > goal:
+            rows = connection.execute("SELECT key, size FROM artifacts ORDER BY accessed LIMIT 256").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                connection.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+                total -= size
+                self.evictions += 1
+                if total <= goal:
+                    break
+        connection.execute("UPDATE totals SET bytes = ? WHERE id = 0", (max(total, 0),))
+
+    def compile(self, source_code, optimize=False, register_count=DEFAULT_REGISTER_COUNT):
+        """Return (result, hit): the stored result, or a fresh one that is run and stored."""
+        result = self.load(source_code, optimize, register_count)
+        if result is not None:
+            return result, True
+        result = CompilationResult(source_code, register_count, optimize)
+        result.run()
+        self.store(result)
+        return result, False
+
+    def clear(self):
+        with self.lock:
+            connection = self.connect()
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM artifacts")
+            connection.execute("UPDATE totals SET bytes = 0 WHERE id = 0")
+            connection.execute("COMMIT")
+
+    def stats(self):
+        with self.lock:
+            connection = self.connect()
+            entries = connection.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+            total = connection.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None and self.pid == os.getpid():
+                self.connection.close()
+            self.connection = None
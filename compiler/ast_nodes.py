@@ -0,0 +1,132 @@
+# ------------------------
+# AST Nodes
+# ------------------------
+# Node kinds, used by the tree walkers instead of comparing type strings.
+NUMBER = 0
+IDENTIFIER = 1
+BINARY_OP = 2
+ASSIGNMENT = 3
+
+# Operator opcodes.
+OP_ADD = 0
+OP_SUB = 1
+OP_MUL = 2
+OP_DIV = 3
+OPERATOR_SYMBOLS = ('+', '-', '*', '/')
+OPCODES = {symbol: code for code, symbol in enumerate(OPERATOR_SYMBOLS)}
+
+class Number:
+    __slots__ = ('value',)
+    kind = NUMBER
+
+    def __init__(self, value):
+        self.value = value
+
+    def to_dict(self):
+        return {'type': 'number', 'value': self.value}
+
+    def __repr__(self):
+        return f"Number({self.value!r})"
+
+class Identifier:
+    __slots__ = ('name',)
+    kind = IDENTIFIER
+
+    def __init__(self, name):
+        self.name = name
+
+    def to_dict(self):
+        return {'type': 'identifier', 'name': self.name}
+
+    def __repr__(self):
+        return f"Identifier({self.name!r})"
+
+class BinaryOp:
+    __slots__ = ('op', 'left', 'right')
+    kind = BINARY_OP
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    @property
+    def operator(self):
+        return OPERATOR_SYMBOLS[self.op]
+
+    def to_dict(self):
+        return node_to_dict(self)
+
+    def __repr__(self):
+        return f"BinaryOp({self.operator!r}, {self.left!r}, {self.right!r})"
+
+class Assignment:
+    __slots__ = ('target', 'expression')
+    kind = ASSIGNMENT
+
+    def __init__(self, target, expression):
+        self.target = target
+        self.expression = expression
+
+    def to_dict(self):
+        return node_to_dict(self)
+
+    def __repr__(self):
+        return f"Assignment({self.target!r}, {self.expression!r})"
+
+# Trees built from deeply nested input can be thousands of levels deep, so the
+# helpers below walk them with an explicit stack instead of recursing.
+def node_to_dict(node):
+    root = {}
+    stack = [(node, root)]
+    while stack:
+        node, out = stack.pop()
+        kind = node.kind
+        if kind == NUMBER:
+            out['type'] = 'number'
+            out['value'] = node.value
+        elif kind == IDENTIFIER:
+            out['type'] = 'identifier'
+            out['name'] = node.name
+        elif kind == BINARY_OP:
+            left = {}
+            right = {}
+            out['type'] = 'binary_op'
+            out['operator'] = OPERATOR_SYMBOLS[node.op]
+            out['left'] = left
+            out['right'] = right
+            stack.append((node.right, right))
+            stack.append((node.left, left))
+        else:
+            expression = {}
+            out['type'] = 'assignment'
+            out['target'] = node.target
+            out['expression'] = expression
+            stack.append((node.expression, expression))
+    return root
+
+def format_node(node):
+    """Render a node exactly as str(node.to_dict()) would."""
+    parts = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        kind = item.kind
+        if kind == NUMBER:
+            parts.append(f"{{'type': 'number', 'value': {item.value!r}}}")
+        elif kind == IDENTIFIER:
+            parts.append(f"{{'type': 'identifier', 'name': {item.name!r}}}")
+        elif kind == BINARY_OP:
+            parts.append(f"{{'type': 'binary_op', 'operator': {OPERATOR_SYMBOLS[item.op]!r}, 'left': ")
+            stack.append('}')
+            stack.append(item.right)
+            stack.append(", 'right': ")
+            stack.append(item.left)
+        else:
+            parts.append(f"{{'type': 'assignment', 'target': {item.target!r}, 'expression': ")
+            stack.append('}')
+            stack.append(item.expression)
+    return ''.join(parts)
@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .compile_source import CompilationResult
+
+# ------------------------
+# Batch Compilation
+# ------------------------
+artifact_caches = {}
+
+def open_artifact_cache(path):
+    # One store per path in each process, opened on first use.
+    cache = artifact_caches.get(path)
+    if cache is None:
+        from .artifact_cache import ArtifactCache
+        cache = artifact_caches[path] = ArtifactCache(path)
+    return cache
+
+def compile_item(source_code, phases=None, optimize=False, cache_path=None):
+    """Compile one program; any failure becomes an error string instead of an exception.
+
+    The item holds the full report as 'output', or with phases, only those
+    sections as 'sections' (see CompilationResult.sections). With cache_path
+    the result comes from, or goes into, that artifact cache, and the item
+    says which in 'cached'.
+    """
+    try:
+        if cache_path is None:
+            result = CompilationResult(source_code, optimize=optimize)
+        else:
+            result, cached = open_artifact_cache(cache_path).compile(source_code, optimize)
+        if phases:
+            item = {'sections': result.sections(phases)}
+        else:
+            item = {'output': result.render()}
+        item['error'] = str(result.error) if result.error is not None else None
+        if cache_path is not None:
+            item['cached'] = cached
+        return item
+    except Exception as e:
+        return failed_item(e, phases)
+
+def failed_item(exception, phases=None):
+    return {'sections' if phases else 'output': None, 'error': f"Internal Error: {type(exception).__name__}: {exception}"}
+
+def compile_chunk(start, sources, phases=None, optimize=False, cache_path=None):
+    return [(start + offset, compile_item(source, phases, optimize, cache_path)) for offset, source in enumerate(sources)]
+
+def iter_compile_many(sources, workers=None, chunksize=32, executor=None, phases=None, optimize=False, cache_path=None):
+    """Yield (index, item) pairs as each chunk of sources finishes compiling.
+
+    Chunks are fanned out over a process pool (a new one sized by workers, or
+    the executor passed in), so items arrive in completion order; index is
+    the position in sources. workers=1 compiles inline without a pool.
+    """
+    sources = list(sources)
+    if executor is None and workers == 1:
+        for index, source in enumerate(sources):
+            yield index, compile_item(source, phases, optimize, cache_path)
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {}
+        for start in range(0, len(sources), chunksize):
+            chunk = sources[start:start + chunksize]
+            futures[executor.submit(compile_chunk, start, chunk, phases, optimize, cache_path)] = (start, len(chunk))
+        for future in as_completed(futures):
+            try:
+                items = future.result()
+            except Exception as e:
+                # A crashed worker only fails the items of its own chunk.
+                start, count = futures[future]
+                error = failed_item(e, phases)
+                items = [(start + offset, error) for offset in range(count)]
+            yield from items
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+def compile_many(sources, workers=None, chunksize=32):
+    """Compile many programs in parallel and return their items in input order."""
+    sources = list(sources)
+    results = [None] * len(sources)
+    for index, item in iter_compile_many(sources, workers, chunksize):
+        results[index] = item
+    return results
@@ -0,0 +1,109 @@
+from array import array
+
+from .ast_nodes import OP_ADD, OP_SUB, OP_MUL, OP_DIV
+from .lexical_analysis import tokenize
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis
+from .intermediate_code_generation import generate_instructions, OP_COPY, Temp
+
+# ------------------------
+# Bytecode Virtual Machine
+# ------------------------
+# Each IR instruction becomes four unsigned ints: opcode, dest, src1, src2.
+# Operands are slot numbers in one flat frame that holds the constants
+# first, then program variables, then temporaries, so the VM never has to
+# tell them apart. The opcodes are the IR ones (OP_ADD..OP_DIV, OP_COPY).
+class Bytecode:
+    __slots__ = ('code', 'initial_frame', 'variables', 'free_variables')
+
+    def __init__(self, code, initial_frame, variables, free_variables):
+        self.code = code                      # array('I') of packed instructions
+        self.initial_frame = initial_frame    # constants, with None in every other slot
+        self.variables = variables            # variable name -> slot
+        self.free_variables = free_variables  # variables read before they are assigned
+
+    def __len__(self):
+        return len(self.code) // 4
+
+    def to_bytes(self):
+        return self.code.tobytes()
+
+def compile_bytecode(instructions):
+    constants = {}
+    variables = {}
+    temps = {}
+    free_variables = []
+    for instruction in instructions:
+        # Sources before the destination, so `x = x + 1` counts as reading x.
+        for position, operand in enumerate((instruction.src1, instruction.src2, instruction.dest)):
+            if operand is None:
+                continue
+            if isinstance(operand, (int, float)):
+                # Keyed on the type too so 1 and 1.0 stay distinct constants.
+                constants.setdefault((type(operand), operand), len(constants))
+            elif isinstance(operand, Temp):
+                temps.setdefault(operand, len(temps))
+            elif operand not in variables:
+                variables[operand] = len(variables)
+                if position < 2:
+                    free_variables.append(operand)
+
+    variable_base = len(constants)
+    temp_base = variable_base + len(variables)
+    initial_frame = [None] * (temp_base + len(temps))
+    for (_, value), slot in constants.items():
+        initial_frame[slot] = value
+
+    def slot(operand):
+        if operand is None:
+            return 0
+        if isinstance(operand, (int, float)):
+            return constants[(type(operand), operand)]
+        if isinstance(operand, Temp):
+            return temp_base + temps[operand]
+        return variable_base + variables[operand]
+
+    code = array('I')
+    for instruction in instructions:
+        code.extend((instruction.op, slot(instruction.dest), slot(instruction.src1), slot(instruction.src2)))
+    variable_slots = {name: variable_base + index for name, index in variables.items()}
+    return Bytecode(code, initial_frame, variable_slots, tuple(free_variables))
+
+def run_bytecode(bytecode, inputs=None):
+    """Execute bytecode and return the final value of every program variable.
+
+    inputs must supply a value for each of bytecode.free_variables.
+    """
+    inputs = inputs or {}
+    missing = [name for name in bytecode.free_variables if name not in inputs]
+    if missing:
+        raise RuntimeError(f"Runtime Error: No value given for {', '.join(missing)}.")
+    frame = list(bytecode.initial_frame)
+    variables = bytecode.variables
+    for name in bytecode.free_variables:
+        frame[variables[name]] = inputs[name]
+
+    it = iter(bytecode.code)
+    try:
+        for op, dest, a, b in zip(it, it, it, it):
+            if op == OP_ADD:
+                frame[dest] = frame[a] + frame[b]
+            elif op == OP_MUL:
+                frame[dest] = frame[a] * frame[b]
+            elif op == OP_SUB:
+                frame[dest] = frame[a] - frame[b]
+            elif op == OP_COPY:
+                frame[dest] = frame[a]
+            elif op == OP_DIV:
+                frame[dest] = frame[a] / frame[b]
+    except ZeroDivisionError:
+        raise RuntimeError("Runtime Error: Division by zero.") from None
+    return {name: frame[slot] for name, slot in variables.items()}
+
+def execute_source(source_code, inputs=None, optimize=False):
+    """Compile source to bytecode and run it; compiler errors propagate as usual."""
+    instructions = generate_instructions(semantic_analysis(syntax_analysis(tokenize(source_code))))
+    if optimize:
+        from .optimization import optimize as optimize_instructions
+        instructions, _ = optimize_instructions(instructions)
+    return run_bytecode(compile_bytecode(instructions), inputs)
@@ -0,0 +1,203 @@
+from bisect import bisect_right, insort
+from heapq import heapify, heappop, heappush
+
+from .intermediate_code_generation import OP_COPY, Temp
+
+# ------------------------
+# Code Generation (Target Code)
+# ------------------------
+# The target is a load/store register machine: ADD/SUB/MUL/DIV work on
+# registers only, LOAD/STORE move values between registers and named memory
+# cells and LOAD_CONST puts a literal into a register.
+DEFAULT_REGISTER_COUNT = 8
+SCRATCH_REGISTERS = 2
+MNEMONICS = ('ADD', 'SUB', 'MUL', 'DIV')
+
+# Where a value comes from.
+CONSTANT = 0  # a literal, rematerialized with LOAD_CONST
+MEMORY = 1    # a variable read before the program assigns it
+RESULT = 2    # computed by an arithmetic instruction
+
+class Value:
+    """A value that must sit in a register from start to end.
+
+    Instruction i reads its operands at position 2*i and writes its result at
+    2*i + 1, so a result may reuse the register of an operand that dies there.
+    """
+    __slots__ = ('kind', 'payload', 'start', 'end', 'home', 'slot', 'register', 'reload_from')
+
+    def __init__(self, kind, payload, start, home=None, slot=None):
+        self.kind = kind
+        self.payload = payload
+        self.start = start
+        self.end = start
+        self.home = home            # variable holding this value from its creation on
+        self.slot = slot            # memory cell to spill to if home is overwritten
+        self.register = None
+        self.reload_from = None
+
+def build_values(instructions):
+    """Liveness analysis: map every operand to a Value and extend its interval to its last use."""
+    values = []
+    plan = []
+    current = {}
+    stores = {}
+    for i, instruction in enumerate(instructions):
+        use = 2 * i
+        operands = (instruction.src1,) if instruction.op == OP_COPY else (instruction.src1, instruction.src2)
+        sources = []
+        for operand in operands:
+            if isinstance(operand, (int, float)):
+                value = Value(CONSTANT, operand, use)
+                values.append(value)
+            else:
+                value = current.get(operand)
+                if value is None:
+                    value = Value(MEMORY, operand, use, home=operand)
+                    current[operand] = value
+                    values.append(value)
+                value.end = use
+            sources.append(value)
+
+        dest = instruction.dest
+        is_variable = not isinstance(dest, Temp)
+        if instruction.op == OP_COPY:
+            value = sources[0]
+        else:
+            value = Value(RESULT, instruction, use + 1,
+                          home=dest if is_variable else None,
+                          slot=None if is_variable else str(dest))
+            values.append(value)
+        if is_variable:
+            stores.setdefault(dest, []).append(use + 1)
+            value.end = max(value.end, use + 1)
+        current[dest] = value
+        plan.append((instruction, sources, value))
+    return values, plan, stores
+
+def linear_scan(values, register_count):
+    """Poletto-Sarkar linear scan; returns the number of values left without a register."""
+    free = list(range(register_count))
+    heapify(free)
+    active = []  # (end, sequence, value), ordered by end
+    spills = 0
+    for sequence, value in enumerate(sorted(values, key=lambda value: value.start)):
+        value.register = None
+        while active and active[0][0] < value.start:
+            heappush(free, active.pop(0)[2].register)
+        if free:
+            value.register = heappop(free)
+            insort(active, (value.end, sequence, value))
+            continue
+        spills += 1
+        if active and active[-1][0] > value.end:
+            # Spill whichever interval reaches furthest, here an active one.
+            victim = active.pop()[2]
+            value.register = victim.register
+            victim.register = None
+            insort(active, (value.end, sequence, value))
+    return spills
+
+def choose_reload_locations(values, stores):
+    spill_slots = 0
+    for value in values:
+        if value.register is not None or value.kind == CONSTANT:
+            continue
+        # The home variable can only be reloaded from until the program
+        # stores to it again.
+        home_stores = stores.get(value.home, ())
+        next_store = bisect_right(home_stores, value.start)
+        overwritten = next_store < len(home_stores) and home_stores[next_store] < value.end
+        if value.home is not None and not overwritten:
+            value.reload_from = value.home
+        else:
+            if value.slot is None:
+                spill_slots += 1
+                value.slot = f"spill{spill_slots}"
+            value.reload_from = value.slot
+
+def allocate_registers(instructions, register_count=DEFAULT_REGISTER_COUNT):
+    """Assign registers to every value; returns (plan, scratch registers, spilled value count)."""
+    if register_count < SCRATCH_REGISTERS:
+        raise ValueError(f"Code generation needs at least {SCRATCH_REGISTERS} registers.")
+    values, plan, stores = build_values(instructions)
+    scratch = ()
+    spills = linear_scan(values, register_count)
+    if spills:
+        # Spilled operands need somewhere to be reloaded into, so set aside
+        # scratch registers and allocate again with the rest.
+        scratch = tuple(range(register_count - SCRATCH_REGISTERS, register_count))
+        spills = linear_scan(values, register_count - SCRATCH_REGISTERS)
+        choose_reload_locations(values, stores)
+    return plan, scratch, spills
+
+def register_name(register):
+    return f"R{register + 1}"
+
+def generate_machine_code(instructions, register_count=DEFAULT_REGISTER_COUNT):
+    """Lower three-address instructions to target instructions.
+
+    Returns (code, stats) where code is a list of (mnemonic, operands...)
+    tuples and stats counts instructions, loads, stores and spilled values.
+    """
+    plan, scratch, spills = allocate_registers(instructions, register_count)
+    code = []
+
+    def load(value, register):
+        if value.kind == CONSTANT:
+            code.append(('LOAD_CONST', register_name(register), value.payload))
+        elif value.start == use and value.kind == MEMORY:
+            code.append(('LOAD', register_name(register), value.payload))
+            if value.register is None and value.reload_from != value.home:
+                code.append(('STORE', register_name(register), value.reload_from))
+        else:
+            code.append(('LOAD', register_name(register), value.reload_from))
+
+    for i, (instruction, sources, value) in enumerate(plan):
+        use = 2 * i
+        registers = []
+        loaded = {}
+        next_scratch = 0
+        for source in sources:
+            register = loaded.get(id(source))
+            if register is None:
+                if source.register is not None:
+                    register = source.register
+                    if source.start == use:
+                        load(source, register)
+                else:
+                    register = scratch[next_scratch]
+                    next_scratch += 1
+                    load(source, register)
+                loaded[id(source)] = register
+            registers.append(register)
+
+        if instruction.op == OP_COPY:
+            register = registers[0]
+        else:
+            register = value.register if value.register is not None else scratch[0]
+            code.append((MNEMONICS[instruction.op], register_name(register),
+                         register_name(registers[0]), register_name(registers[1])))
+            if value.register is None and value.reload_from == value.slot:
+                code.append(('STORE', register_name(register), value.slot))
+        if not isinstance(instruction.dest, Temp):
+            code.append(('STORE', register_name(register), instruction.dest))
+
+    stats = {
+        'instructions': len(code),
+        'loads': sum(1 for line in code if line[0] in ('LOAD', 'LOAD_CONST')),
+        'stores': sum(1 for line in code if line[0] == 'STORE'),
+        'spilled_values': spills,
+        'registers': register_count,
+    }
+    return code, stats
+
+def format_machine_line(line):
+    return f"{line[0]} {', '.join(str(operand) for operand in line[1:])}"
+
+def format_machine_code(code):
+    return "\n".join(map(format_machine_line, code))
+
+def code_generation(instructions, register_count=DEFAULT_REGISTER_COUNT):
+    code, _ = generate_machine_code(instructions, register_count)
+    return format_machine_code(code)
@@ -0,0 +1,156 @@
+import argparse
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+from .artifact_cache import default_cache_path
+from .compile_source import PHASES
+
+# ------------------------
+# Command Line
+# ------------------------
+#   python -m compiler programs/ extra.txt "more/**/*.txt" --out-dir build
+#   python -m compiler programs/ --report report.jsonl --optimize
+# Directories are searched recursively for files matching --pattern, and
+# every source is compiled in parallel on a process pool. Sources whose
+# content, options and compiler are unchanged since an earlier run (of the
+# CLI or of the web backend) are loaded from the artifact cache instead.
+DEFAULT_PATTERN = '*.txt'
+OUTPUT_EXTENSIONS = {'intermediate': '.ir', 'optimization': '.opt.ir', 'target': '.asm'}
+
+def find_sources(arguments, pattern):
+    """Expand files, directories and glob patterns to a list of (path, output name)."""
+    found = []
+    for argument in arguments:
+        if os.path.isdir(argument):
+            for directory, subdirectories, files in os.walk(argument):
+                subdirectories.sort()
+                for name in sorted(files):
+                    path = os.path.join(directory, name)
+                    if fnmatch.fnmatch(name, pattern):
+                        found.append((path, os.path.relpath(path, argument)))
+        elif os.path.isfile(argument):
+            found.append((argument, os.path.basename(argument)))
+        elif glob.has_magic(argument):
+            for path in sorted(glob.glob(argument, recursive=True)):
+                if os.path.isfile(path):
+                    found.append((path, os.path.basename(path)))
+        else:
+            raise FileNotFoundError(f"No such file, directory or matching pattern: {argument}")
+    return found
+
+def same_contents(path, text):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return file.read() == text
+    except (OSError, UnicodeDecodeError):
+        return False
+
+def write_outputs(out_dir, name, item):
+    """Write one file per section next to each other under out_dir; returns how many were written.
+
+    Files that already hold exactly the section are left untouched.
+    """
+    written = 0
+    base = os.path.join(out_dir, os.path.splitext(name)[0])
+    for phase, text in (item.get('sections') or {}).items():
+        if text is None:
+            continue
+        path = base + OUTPUT_EXTENSIONS.get(phase, '.' + phase)
+        text += "\n"
+        if same_contents(path, text):
+            continue
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        written += 1
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m compiler', description="Compile source files in parallel.")
+    parser.add_argument('paths', nargs='+', help="source files, directories or glob patterns")
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN,
+                        help="file name pattern used inside directories (default %(default)s)")
+    parser.add_argument('--out-dir', help="write <name>.ir and <name>.asm for every source here")
+    parser.add_argument('--report', help="write one JSON line per source to this file ('-' for stdout)")
+    parser.add_argument('--phases', help="comma-separated sections to produce (default intermediate,target)")
+    parser.add_argument('--optimize', action='store_true', help="run the IR optimization passes")
+    parser.add_argument('--jobs', '-j', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--cache', default=default_cache_path(),
+                        help="artifact cache file, shared with the web backend (default %(default)s)")
+    parser.add_argument('--no-cache', action='store_true', help="compile everything and leave the cache alone")
+    args = parser.parse_args(argv)
+
+    if args.phases:
+        phases = [phase.strip() for phase in args.phases.split(',') if phase.strip()]
+        unknown = [phase for phase in phases if phase not in PHASES]
+        if unknown or not phases:
+            parser.error(f"unknown phases: {', '.join(unknown)}; choose from {', '.join(PHASES)}")
+    else:
+        phases = ['intermediate', 'optimization', 'target'] if args.optimize else ['intermediate', 'target']
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    try:
+        sources = find_sources(args.paths, args.pattern)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    names = {}
+    for path, name in sources:
+        if names.setdefault(name, path) != path:
+            parser.error(f"{path} and {names[name]} would both be written as {name}")
+
+    start = time.perf_counter()
+    items = [None] * len(sources)
+    keys = [None] * len(sources)
+    pending = []
+    total_bytes = 0
+    for index, (path, name) in enumerate(sources):
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            source_code = data.decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            items[index] = {'sections': None, 'error': f"Read Error: {e}"}
+            continue
+        total_bytes += len(data)
+        keys[index] = hashlib.sha256(data).hexdigest()
+        pending.append((index, source_code))
+
+    if pending:
+        from .batch_compilation import iter_compile_many
+        compiled = iter_compile_many([source_code for _, source_code in pending], workers=args.jobs, phases=phases,
+                                     optimize=args.optimize, cache_path=None if args.no_cache else args.cache)
+        for position, item in compiled:
+            items[pending[position][0]] = item
+
+    report = None
+    if args.report == '-':
+        report = sys.stdout
+    elif args.report:
+        report = open(args.report, 'w', encoding='utf-8')
+    errors = 0
+    written = 0
+    try:
+        for (path, name), key, item in zip(sources, keys, items):
+            if item['error'] is not None:
+                errors += 1
+                print(f"{path}: {item['error']}", file=sys.stderr)
+            if args.out_dir:
+                written += write_outputs(args.out_dir, name, item)
+            if report is not None:
+                report.write(json.dumps({'path': path, 'sha256': key, **item}) + "\n")
+    finally:
+        if report is not None and report is not sys.stdout:
+            report.close()
+
+    seconds = time.perf_counter() - start
+    cached = sum(1 for item in items if item.get('cached'))
+    print(f"{len(sources)} files ({total_bytes / 1e6:.2f} MB): {len(pending) - cached} compiled, {cached} cached, "
+          f"{errors} with errors, {written} outputs written in {seconds:.2f}s "
+          f"({len(sources) / seconds if seconds else 0:.0f} files/s, {total_bytes / 1e6 / seconds if seconds else 0:.2f} MB/s)",
+          file=sys.stderr)
+    return 1 if errors else 0
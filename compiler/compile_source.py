@@ -0,0 +1,214 @@
+from itertools import chain
+
+from .lexical_analysis import tokenize
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis
+from .intermediate_code_generation import generate_instructions, format_instructions
+from .code_generation import generate_machine_code, format_machine_code, format_machine_line, DEFAULT_REGISTER_COUNT
+from .ast_nodes import format_node
+from .instrumentation import sample_profile, start_tracing, stop_tracing, measure, count_nodes
+
+# ------------------------
+# Compiler Simulator (Combined)
+# ------------------------
+PHASES = ('source', 'tokens', 'syntax', 'semantic', 'intermediate', 'optimization', 'target')
+
+SECTION_HEADERS = {
+    'source': "Source Code:",
+    'tokens': "\n[Lexical Analysis Output]",
+    'syntax': "\n[Syntax Analysis Output (ASTs)]",
+    'semantic': "\n[Semantic Analysis Output (ASTs with Semantic Info)]",
+    'intermediate': "\n[Intermediate Code]",
+    'optimization': "\n[Optimized Intermediate Code]",
+    'target': "\n[Target Code Generation]",
+}
+
+# Rough size, in characters, of the pieces iter_chunks() splits sections into.
+CHUNK_SIZE = 64 * 1024
+
+class CompilationResult:
+    """The output of every compiler phase, computed and rendered on demand.
+
+    Phases run in order the first time one of their results is needed, and
+    sections are only formatted when asked for. A SyntaxError or RuntimeError
+    stops the pipeline and is kept in ``error`` rather than raised. The
+    optimization phase only runs, and only appears in the report, when
+    optimize is true; otherwise target code is generated from the IR as is.
+    A profiled result fills ``metrics`` with the cost of each phase it ran.
+    """
+
+    def __init__(self, source_code, register_count=DEFAULT_REGISTER_COUNT, optimize=False, profile=None):
+        self.source_code = source_code
+        self.register_count = register_count
+        self.optimize = optimize
+        self.error = None
+        self.completed = 0  # index into PHASES of the last phase that finished
+        self.tokens = None
+        self.ast_list = None
+        self.folded_ast_list = None
+        self.instructions = None
+        self.optimized_instructions = None
+        self.optimization_report = None
+        self.machine_code = None
+        self.target_stats = None
+        # Per-phase costs when profiled (profile=True, or picked by sampling
+        # when profile is None); None otherwise.
+        self.metrics = {} if (sample_profile() if profile is None else profile) else None
+
+    def run(self, phase='target'):
+        """Run the pipeline up to phase; returns False if an earlier phase failed."""
+        goal = PHASES.index(phase)
+        profiling = self.metrics is not None and self.completed < goal and self.error is None
+        if profiling:
+            start_tracing()
+        try:
+            while self.completed < goal and self.error is None:
+                step = self.completed + 1
+                if profiling:
+                    sample = measure(self.run_step, step)
+                    sample['items'] = self.phase_items(step)
+                    self.metrics[PHASES[step]] = sample
+                else:
+                    self.run_step(step)
+                self.completed = step
+        except (SyntaxError, RuntimeError) as e:
+            self.error = e
+        finally:
+            if profiling:
+                stop_tracing()
+        return self.completed >= goal
+
+    def run_step(self, step):
+        if step == 1:
+            self.tokens = tokenize(self.source_code)
+        elif step == 2:
+            self.ast_list = syntax_analysis(self.tokens)
+        elif step == 3:
+            self.folded_ast_list = semantic_analysis(self.ast_list)
+        elif step == 4:
+            self.instructions = generate_instructions(self.folded_ast_list)
+        elif step == 5:
+            if self.optimize:
+                # Imported here so that results without optimize never load the optimizer.
+                from .optimization import optimize
+                self.optimized_instructions, self.optimization_report = optimize(self.instructions)
+            else:
+                self.optimized_instructions = self.instructions
+        else:
+            self.machine_code, self.target_stats = generate_machine_code(self.optimized_instructions, self.register_count)
+            if self.optimize:
+                unoptimized, _ = generate_machine_code(self.instructions, self.register_count)
+                self.optimization_report['target_before'] = len(unoptimized)
+                self.optimization_report['target_after'] = len(self.machine_code)
+
+    def phase_items(self, step):
+        """What a finished phase produced: tokens, AST nodes or instructions."""
+        if step == 1:
+            return len(self.tokens)
+        elif step == 2:
+            return count_nodes(self.ast_list)
+        elif step == 3:
+            return count_nodes(self.folded_ast_list)
+        elif step == 4:
+            return len(self.instructions)
+        elif step == 5:
+            return len(self.optimized_instructions)
+        return len(self.machine_code)
+
+    @property
+    def intermediate_code(self):
+        return None if self.instructions is None else format_instructions(self.instructions)
+
+    @property
+    def target_code(self):
+        return None if self.machine_code is None else format_machine_code(self.machine_code)
+
+    def section_lines(self, phase):
+        """The lines of one section, formatted lazily as they are iterated; None if the pipeline stopped before it."""
+        if not self.run(phase):
+            return None
+        if phase == 'source':
+            return [self.source_code]
+        elif phase == 'tokens':
+            return map(str, self.tokens)
+        elif phase == 'syntax':
+            return map(format_node, self.ast_list)
+        elif phase == 'semantic':
+            return map(format_node, self.folded_ast_list)
+        elif phase == 'intermediate':
+            return map(str, self.instructions)
+        elif phase == 'optimization':
+            if not self.optimize:
+                return None
+            # Target counts are part of the report, so generate the target code too.
+            self.run('target')
+            from .optimization import format_optimization_report
+            return chain(map(str, self.optimized_instructions), format_optimization_report(self.optimization_report))
+        else:
+            return map(format_machine_line, self.machine_code)
+
+    def section(self, phase):
+        """Rendered body of one section, or None if the pipeline stopped before it."""
+        lines = self.section_lines(phase)
+        return None if lines is None else "\n".join(lines)
+
+    def sections(self, phases=PHASES):
+        return {phase: self.section(phase) for phase in phases}
+
+    def iter_sections(self):
+        """Yield (phase, pieces) for each section of the report in order, running phases as it goes.
+
+        A section's pieces are its header and then its lines; the error, if
+        any, comes last as phase 'error'. All pieces joined with newlines
+        make up render().
+        """
+        for phase in PHASES:
+            if phase == 'optimization' and not self.optimize:
+                continue
+            lines = self.section_lines(phase)
+            if lines is None:
+                break
+            yield phase, chain((SECTION_HEADERS[phase],), lines)
+        if self.error is not None:
+            yield 'error', ("\nError:\n" + str(self.error),)
+
+    def iter_render(self):
+        """Yield (phase, text) for each section of the report in order; joined with newlines the texts make up render()."""
+        for phase, pieces in self.iter_sections():
+            yield phase, "\n".join(pieces)
+
+    def iter_chunks(self, phases=PHASES, chunk_size=CHUNK_SIZE):
+        """Like iter_render, but yield each section in pieces of about chunk_size characters.
+
+        Only the sections in phases are produced. A piece is yielded as soon
+        as its lines are formatted, so no section is ever held whole; the
+        pieces of one phase concatenated give the text iter_render yields.
+        """
+        for phase in PHASES:
+            if phase not in phases or (phase == 'optimization' and not self.optimize):
+                continue
+            lines = self.section_lines(phase)
+            if lines is None:
+                break
+            parts = [SECTION_HEADERS[phase]]
+            size = len(parts[0])
+            for line in lines:
+                parts.append("\n")
+                parts.append(line)
+                size += len(line) + 1
+                if size >= chunk_size:
+                    yield phase, "".join(parts)
+                    parts = []
+                    size = 0
+            if parts:
+                yield phase, "".join(parts)
+        if self.error is not None:
+            yield 'error', "\nError:\n" + str(self.error)
+
+    def render(self):
+        return "\n".join(text for _, text in self.iter_render())
+
+    __str__ = render
+
+def compile_source(source_code, optimize=False):
+    return CompilationResult(source_code, optimize=optimize).render()
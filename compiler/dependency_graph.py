@@ -0,0 +1,270 @@
+from heapq import heapify, heappop, heappush
+from operator import add, sub, mul, truediv
+
+from .ast_nodes import Number, BinaryOp, Assignment, NUMBER, IDENTIFIER, BINARY_OP, OP_DIV
+from .lexical_analysis import tokenize
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis, fold_values
+
+# ------------------------
+# Statement Dependency Graph
+# ------------------------
+# Programs are straight-line, so every identifier a statement reads comes
+# from exactly one place: the closest assignment to it above, or the
+# program's input of that name if there is none. DependencyGraph records
+# these def-use edges. They drive the two passes below and
+# IncrementalEvaluator, which evaluates a program once and afterwards
+# only re-evaluates the statements downstream of the inputs that changed.
+OPERATORS = (add, sub, mul, truediv)  # indexed by OP_ADD..OP_DIV
+
+def read_names(expression):
+    """The identifiers an expression reads, each once, in order of first appearance."""
+    names = {}
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        kind = node.kind
+        if kind == IDENTIFIER:
+            names[node.name] = None
+        elif kind == BINARY_OP:
+            stack.append(node.right)
+            stack.append(node.left)
+    return list(names)
+
+def may_raise(expression):
+    """Whether evaluating an expression can divide by zero."""
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        if node.kind == BINARY_OP:
+            if node.op == OP_DIV and (node.right.kind != NUMBER or node.right.value == 0):
+                return True
+            stack.append(node.right)
+            stack.append(node.left)
+    return False
+
+def free_variables(ast_list):
+    """Variables read before the program assigns them, in order of first read."""
+    assigned = set()
+    free = {}
+    for statement in ast_list:
+        for name in read_names(statement.expression):
+            if name not in assigned:
+                free[name] = None
+        assigned.add(statement.target)
+    return list(free)
+
+class DependencyGraph:
+    """Def-use edges between the statements of a program (ASTs from syntax or semantic analysis)."""
+
+    def __init__(self, ast_list):
+        self.statements = ast_list
+        self.sources = []                      # per statement: {name read: defining statement, or -1 for an input}
+        self.users = [[] for _ in ast_list]    # per statement: the statements that read its value
+        self.input_users = {}                  # input name -> statements that read it
+        self.final = {}                        # variable -> statement that assigns its final value
+        for index, statement in enumerate(ast_list):
+            sources = {}
+            for name in read_names(statement.expression):
+                definition = sources[name] = self.final.get(name, -1)
+                if definition < 0:
+                    self.input_users.setdefault(name, []).append(index)
+                else:
+                    self.users[definition].append(index)
+            self.sources.append(sources)
+            self.final[statement.target] = index
+
+    def __len__(self):
+        return len(self.statements)
+
+    @property
+    def inputs(self):
+        """Variables read before the program assigns them."""
+        return list(self.input_users)
+
+    def downstream(self, names):
+        """Indices, in program order, of every statement whose value depends on one of the given inputs."""
+        seen = set()
+        stack = [index for name in names for index in self.input_users.get(name, ())]
+        while stack:
+            index = stack.pop()
+            if index not in seen:
+                seen.add(index)
+                stack.extend(self.users[index])
+        return sorted(seen)
+
+def propagate_constants(ast_list):
+    """Substitute variables known to hold a constant into later statements and fold again.
+
+    Returns new statements. A division by a propagated zero is left for
+    run time, where it is an error, rather than made a compile error.
+    """
+    constants = {}  # variable -> Number it currently holds
+    statements = []
+    for statement in ast_list:
+        results = []
+        stack = [(statement.expression, False)]
+        while stack:
+            node, visited = stack.pop()
+            kind = node.kind
+            if kind == IDENTIFIER:
+                results.append(constants.get(node.name, node))
+            elif kind != BINARY_OP:
+                results.append(node)
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                right = results.pop()
+                left = results.pop()
+                if left.kind == NUMBER and right.kind == NUMBER and not (node.op == OP_DIV and right.value == 0):
+                    results.append(Number(fold_values(node.op, left.value, right.value)))
+                elif left is node.left and right is node.right:
+                    results.append(node)
+                else:
+                    results.append(BinaryOp(node.op, left, right))
+        expression = results[0]
+        if expression.kind == NUMBER:
+            constants[statement.target] = expression
+        else:
+            constants.pop(statement.target, None)
+        statements.append(statement if expression is statement.expression else Assignment(statement.target, expression))
+    return statements
+
+def eliminate_dead_assignments(ast_list, outputs=None):
+    """Drop assignments whose value is never used; returns the statements that are kept.
+
+    Without outputs every variable's final value counts as used, so only
+    assignments overwritten before being read (and `x = x`) are dropped.
+    With outputs, only those variables' final values are used. As in the
+    optimizer, statements that may divide by zero are always kept, so the
+    program still fails where the bytecode VM does.
+    """
+    live = {statement.target for statement in ast_list} if outputs is None else set(outputs)
+    kept = []
+    for statement in reversed(ast_list):
+        target = statement.target
+        expression = statement.expression
+        if expression.kind == IDENTIFIER and expression.name == target:
+            continue
+        if target not in live and not may_raise(expression):
+            continue
+        live.discard(target)
+        live.update(read_names(expression))
+        kept.append(statement)
+    kept.reverse()
+    return kept
+
+def evaluate_expression(expression, values):
+    """Value of an expression, reading identifiers from the values mapping."""
+    results = []
+    stack = [(expression, False)]
+    while stack:
+        node, visited = stack.pop()
+        kind = node.kind
+        if kind == NUMBER:
+            results.append(node.value)
+        elif kind == IDENTIFIER:
+            results.append(values[node.name])
+        elif not visited:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        else:
+            right = results.pop()
+            results[-1] = OPERATORS[node.op](results[-1], right)
+    return results[0]
+
+def changed(old, new):
+    # 1 and 1.0 are equal but lead to different results downstream.
+    return type(old) is not type(new) or old != new
+
+class IncrementalEvaluator:
+    """Evaluates a program repeatedly, each time re-evaluating only what the changed inputs reach.
+
+    The statements are first simplified with propagate_constants and
+    eliminate_dead_assignments. run() and update() keep every
+    statement's value, so when an update changes a few inputs only the
+    statements reading them are evaluated again. After that, only the
+    statements reading a value that actually changed are evaluated.
+    """
+
+    def __init__(self, ast_list, outputs=None):
+        self.outputs = None if outputs is None else list(outputs)
+        self.free_variables = dict.fromkeys(free_variables(ast_list))  # ordered, with fast lookups
+        self.graph = DependencyGraph(eliminate_dead_assignments(propagate_constants(ast_list), outputs))
+        self.inputs = {}
+        self.values = None  # value of each statement; None until a run succeeds
+        self.evaluated = 0  # statements evaluated by the last update
+
+    @classmethod
+    def from_source(cls, source_code, outputs=None):
+        """Compile source (compiler errors propagate as usual) and wrap it in an evaluator."""
+        return cls(semantic_analysis(syntax_analysis(tokenize(source_code))), outputs)
+
+    def run(self, inputs):
+        """Evaluate with these inputs; returns {name: value} for every variable, like run_bytecode."""
+        self.update(inputs)
+        return self.variables()
+
+    def update(self, inputs):
+        """Change some inputs; returns {name: value} for each variable whose final value changed."""
+        graph = self.graph
+        changed_inputs = [name for name, value in inputs.items()
+                          if name not in self.inputs or changed(self.inputs[name], value)]
+        self.inputs.update(inputs)
+        full = self.values is None
+        if full:
+            missing = [name for name in self.free_variables if name not in self.inputs]
+            if missing:
+                raise RuntimeError(f"Runtime Error: No value given for {', '.join(missing)}.")
+            self.values = [None] * len(graph)
+            pending = list(range(len(graph)))
+            changed_inputs = list(self.free_variables)
+        else:
+            pending = list({index for name in changed_inputs for index in graph.input_users.get(name, ())})
+        heapify(pending)
+        queued = set(pending)
+        free = self.free_variables
+        updates = {name: self.inputs[name] for name in changed_inputs if name in free and name not in graph.final}
+        statements = graph.statements
+        values = self.values
+        evaluated = 0
+        try:
+            while pending:
+                index = heappop(pending)
+                queued.discard(index)
+                scope = {name: self.inputs[name] if source < 0 else values[source]
+                         for name, source in graph.sources[index].items()}
+                value = evaluate_expression(statements[index].expression, scope)
+                evaluated += 1
+                if not full and not changed(values[index], value):
+                    continue
+                values[index] = value
+                target = statements[index].target
+                if graph.final[target] == index:
+                    updates[target] = value
+                for user in graph.users[index]:
+                    if user not in queued:
+                        queued.add(user)
+                        heappush(pending, user)
+        except ZeroDivisionError:
+            # Some statement values are now stale; start over on the next run.
+            self.values = None
+            raise RuntimeError("Runtime Error: Division by zero.") from None
+        finally:
+            self.evaluated = evaluated
+        if self.outputs is not None:
+            updates = {name: value for name, value in updates.items() if name in self.outputs}
+        return updates
+
+    def variables(self):
+        """Current value of every variable (or only of the outputs, if given)."""
+        graph = self.graph
+        variables = {name: self.inputs[name] for name in self.free_variables}
+        for name, index in graph.final.items():
+            variables[name] = self.values[index]
+        if self.outputs is not None:
+            variables = {name: variables[name] for name in self.outputs if name in variables}
+        return variables
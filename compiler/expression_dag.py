@@ -0,0 +1,170 @@
+from sys import intern
+
+from .ast_nodes import Number, Identifier, BinaryOp, Assignment, NUMBER, IDENTIFIER, BINARY_OP
+from .semantic_analysis import fold_values
+from .intermediate_code_generation import Instruction, Temp, OP_COPY
+
+# ------------------------
+# Expression DAG
+# ------------------------
+# A NodeFactory hands out one node per distinct subexpression. Numbers are
+# keyed by repr, so 1, 1.0 and -0.0 stay apart. Identifiers are keyed by
+# name, and binary operations by (operator, id(left), id(right)). Children
+# are interned before their parents, so equal subtrees anywhere in a program
+# become the same object and the statements form a DAG:
+#   factory = NodeFactory()
+#   ast_list = syntax_analysis(tokenize(source), factory)
+#   folded = fold_shared(ast_list, factory)
+#   instructions = generate_shared(folded)
+# The passes below key their work on id(node), so each unique node is folded
+# once and computed into one temp.
+
+class NodeFactory:
+    def __init__(self):
+        self.nodes = {}  # key -> the one node with that shape; keeps ids in keys valid
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def number(self, value):
+        key = (NUMBER, repr(value))
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = Number(value)
+        return node
+
+    def identifier(self, name):
+        key = (IDENTIFIER, name)
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = Identifier(name)
+        return node
+
+    def binary(self, op, left, right):
+        """left and right must come from this factory."""
+        key = (BINARY_OP, op, id(left), id(right))
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = BinaryOp(op, left, right)
+        return node
+
+    def intern_statements(self, ast_list):
+        """Rebuild statements parsed without a factory as a DAG."""
+        memo = {}  # id(tree node) -> interned node
+        statements = []
+        for ast in ast_list:
+            stack = [(ast.expression, False)]
+            while stack:
+                node, visited = stack.pop()
+                if id(node) in memo:
+                    continue
+                kind = node.kind
+                if kind == NUMBER:
+                    memo[id(node)] = self.number(node.value)
+                elif kind == IDENTIFIER:
+                    memo[id(node)] = self.identifier(node.name)
+                elif not visited:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                else:
+                    memo[id(node)] = self.binary(node.op, memo[id(node.left)], memo[id(node.right)])
+            statements.append(Assignment(ast.target, memo[id(ast.expression)]))
+        return statements
+
+def fold_shared(ast_list, factory):
+    """semantic_analysis for a DAG: every unique node is folded once, and the folded nodes are interned too."""
+    memo = {}  # id(node) -> folded node
+    folded_list = []
+    for ast in ast_list:
+        stack = [(ast.expression, False)]
+        while stack:
+            node, visited = stack.pop()
+            if id(node) in memo:
+                continue
+            if node.kind != BINARY_OP:
+                memo[id(node)] = node
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                left = memo[id(node.left)]
+                right = memo[id(node.right)]
+                if left.kind == NUMBER and right.kind == NUMBER:
+                    memo[id(node)] = factory.number(fold_values(node.op, left.value, right.value))
+                elif left is node.left and right is node.right:
+                    memo[id(node)] = node
+                else:
+                    memo[id(node)] = factory.binary(node.op, left, right)
+        folded_list.append(Assignment(ast.target, memo[id(ast.expression)]))
+    return folded_list
+
+def generate_shared(ast_list):
+    """generate_instructions for a DAG: a unique subexpression is computed into one temp.
+
+    The temp is reused by later statements until a variable the
+    subexpression reads is assigned again.
+    """
+    instructions = []
+    temps = {}       # id(node) -> Temp holding its current value
+    dependents = {}  # variable name or id(node) -> ids of the computed nodes that read it
+    temp_counter = 1
+
+    def operand(node):
+        kind = node.kind
+        if kind == NUMBER:
+            return node.value
+        elif kind == IDENTIFIER:
+            return intern(node.name)
+        return temps[id(node)]
+
+    for ast in ast_list:
+        stack = [(ast.expression, False)]
+        while stack:
+            node, visited = stack.pop()
+            if node.kind != BINARY_OP or id(node) in temps:
+                continue
+            if not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            temp = Temp(temp_counter)
+            temp_counter += 1
+            instructions.append(Instruction(node.op, temp, operand(node.left), operand(node.right)))
+            temps[id(node)] = temp
+            for child in (node.left, node.right):
+                if child.kind == IDENTIFIER:
+                    dependents.setdefault(child.name, []).append(id(node))
+                elif child.kind == BINARY_OP:
+                    dependents.setdefault(id(child), []).append(id(node))
+        instructions.append(Instruction(OP_COPY, intern(ast.target), operand(ast.expression)))
+        # Forget every temp computed from the old value of the target.
+        pending = dependents.pop(ast.target, [])
+        while pending:
+            key = pending.pop()
+            if temps.pop(key, None) is not None:
+                pending.extend(dependents.pop(key, ()))
+    return instructions
+
+def dag_stats(ast_list):
+    """Node counts: 'total_nodes' if every statement were a separate tree, 'unique_nodes' in the DAG."""
+    sizes = {}  # id(node) -> size of the tree the node stands for
+    total = 0
+    for ast in ast_list:
+        stack = [(ast.expression, False)]
+        while stack:
+            node, visited = stack.pop()
+            if id(node) in sizes:
+                continue
+            if node.kind != BINARY_OP:
+                sizes[id(node)] = 1
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                sizes[id(node)] = 1 + sizes[id(node.left)] + sizes[id(node.right)]
+        total += sizes[id(ast.expression)]
+    return {'statements': len(ast_list), 'total_nodes': total, 'unique_nodes': len(sizes)}
@@ -0,0 +1,405 @@
+from itertools import repeat
+
+from .lexical_analysis import tokenize
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis
+from .intermediate_code_generation import generate_statement, Instruction, Temp
+from .code_generation import DEFAULT_REGISTER_COUNT, format_machine_line
+from .ast_nodes import format_node
+from .compile_source import CompilationResult, PHASES
+
+# ------------------------
+# Incremental Compilation
+# ------------------------
+# The source is cut after every ';' into statement segments. Lexing, parsing,
+# folding and IR generation are done per segment and kept between compiles,
+# so after an edit only the segments on the edited lines are compiled again.
+# Statements further down keep their results and only have their positions
+# and temporaries shifted when something above them changed. Optimization
+# and register allocation work on the whole program, so they are only
+# skipped when the edit left the IR as it was, e.g. after moving code down a
+# line; then the previous optimized IR and target code are taken over.
+#
+# Reports are compared section by section (changed_ranges), so a front end
+# only has to redraw the lines that differ from the report it is showing.
+
+class StatementUnit:
+    """Position-independent results for one segment of source text.
+
+    Tokens are lexed as if the segment started on line 1, and temporaries
+    are numbered from t1; Segment shifts both to where the text really is.
+    """
+    __slots__ = ('text', 'column', 'newlines', 'failed', 'tokens', 'eof', 'ast_list',
+                 'folded_ast_list', 'instructions', 'temp_count', 'formatted')
+
+    def __init__(self, text, column):
+        self.text = text
+        self.column = column
+        self.newlines = text.count('\n')
+        self.failed = None  # first phase that raised, if any
+        self.tokens = None
+        self.eof = None
+        self.ast_list = []
+        self.folded_ast_list = []
+        self.instructions = []
+        self.temp_count = 0
+        self.formatted = {}
+        try:
+            stream = tokenize(text, 1, column)
+        except RuntimeError:
+            self.failed = 'tokens'
+            return
+        self.tokens = list(stream)
+        self.eof = self.tokens.pop()
+        try:
+            self.ast_list = syntax_analysis(stream)
+        except (SyntaxError, RuntimeError):
+            self.failed = 'syntax'
+            return
+        try:
+            self.folded_ast_list = semantic_analysis(self.ast_list)
+        except RuntimeError:
+            self.failed = 'semantic'
+            return
+        temp_counter = 1
+        for ast in self.folded_ast_list:
+            temp_counter = generate_statement(ast, self.instructions, temp_counter)
+        self.temp_count = temp_counter - 1
+
+    def section_lines(self, phase):
+        lines = self.formatted.get(phase)
+        if lines is None:
+            ast_list = self.ast_list if phase == 'syntax' else self.folded_ast_list
+            lines = self.formatted[phase] = [format_node(ast) for ast in ast_list]
+        return lines
+
+def unit_key(text, column):
+    # The start column only matters if the segment's first line has code on it.
+    newline = text.find('\n')
+    first_line = text if newline < 0 else text[:newline]
+    return (text, column if first_line.strip() else 0)
+
+def shift_temp(operand, shift):
+    return Temp(operand.number + shift) if isinstance(operand, Temp) else operand
+
+class Segment:
+    """One statement segment placed in the program: where it starts and which temps it uses."""
+    __slots__ = ('unit', 'offset', 'line', 'column', 'tokens', 'tokens_line', 'tokens_text',
+                 'first_temp', 'instructions', 'ir_text')
+
+    def __init__(self, unit, offset, line, column):
+        self.unit = unit
+        self.offset = offset
+        self.line = line
+        self.column = column
+        self.tokens = None
+        self.tokens_line = None
+        self.tokens_text = None
+        self.first_temp = 1
+        self.instructions = unit.instructions
+        self.ir_text = None
+
+    def end(self):
+        """(offset, line, column) just past the segment."""
+        text = self.unit.text
+        if self.unit.newlines:
+            return self.offset + len(text), self.line + self.unit.newlines, len(text) - text.rfind('\n')
+        return self.offset + len(text), self.line, self.column + len(text)
+
+    def last_line(self):
+        return self.line + self.unit.newlines
+
+    def placed_tokens(self):
+        if self.tokens_line != self.line:
+            shift = self.line - 1
+            self.tokens = [(kind, value, line + shift, column) for kind, value, line, column in self.unit.tokens]
+            self.tokens_line = self.line
+            self.tokens_text = "\n".join(str(token) for token in self.tokens) if self.tokens else None
+        return self.tokens
+
+    def place_temps(self, first_temp):
+        """Renumber this segment's temporaries to start at first_temp, if they don't already."""
+        if first_temp != self.first_temp:
+            shift = first_temp - 1
+            self.instructions = [Instruction(instruction.op, shift_temp(instruction.dest, shift),
+                                             shift_temp(instruction.src1, shift), shift_temp(instruction.src2, shift))
+                                 for instruction in self.unit.instructions]
+            self.first_temp = first_temp
+            self.ir_text = None
+        if self.ir_text is None and self.instructions:
+            self.ir_text = "\n".join(str(instruction) for instruction in self.instructions)
+
+def split_segments(text, offset, line, column, reusable):
+    """Cut text into segments after every ';'; returns (segments, text after the last ';')."""
+    segments = []
+    pieces = text.split(';')
+    for piece in pieces[:-1]:
+        piece += ';'
+        key = unit_key(piece, column)
+        unit = reusable.pop(key, None) or StatementUnit(piece, key[1] or column)
+        segment = Segment(unit, offset, line, column)
+        segments.append(segment)
+        offset, line, column = segment.end()
+    return segments, pieces[-1]
+
+class IncrementalResult(CompilationResult):
+    """A CompilationResult whose early phases come from an IncrementalCompiler's segments."""
+
+    def __init__(self, source_code, segments, register_count=DEFAULT_REGISTER_COUNT, optimize=False):
+        super().__init__(source_code, register_count, optimize)
+        self.segments = segments
+        failed = None
+        for segment in segments:
+            if segment.unit.failed is not None:
+                failed = segment
+                break
+        if failed is None:
+            self.completed = PHASES.index('intermediate')
+        else:
+            # Segments are compiled in isolation, so a lexical error further
+            # down still has to win over a syntax error in this one.
+            phase = failed.unit.failed
+            if phase != 'tokens':
+                for segment in segments:
+                    if segment.unit.failed == 'tokens':
+                        failed, phase = segment, 'tokens'
+                        break
+            if phase == 'semantic':
+                for segment in segments:
+                    if segment.unit.failed == 'syntax':
+                        failed, phase = segment, 'syntax'
+                        break
+            self.completed = PHASES.index(phase) - 1
+            self.error = self.locate_error(failed)
+        # Segments are moved by later updates, so their texts are copied here.
+        self.token_lines = None
+        self.ir_lines = None
+        self.target_lines = None
+        if self.completed >= PHASES.index('tokens'):
+            self.tokens = [token for segment in segments for token in segment.placed_tokens()]
+            self.tokens.append(self.eof_token())
+            self.token_lines = [segment.tokens_text for segment in segments if segment.tokens_text]
+            self.token_lines.append(str(self.tokens[-1]))
+        if self.completed >= PHASES.index('syntax'):
+            self.ast_list = [ast for segment in segments for ast in segment.unit.ast_list]
+        if self.completed >= PHASES.index('semantic'):
+            self.folded_ast_list = [ast for segment in segments for ast in segment.unit.folded_ast_list]
+        if self.completed >= PHASES.index('intermediate'):
+            self.instructions = [instruction for segment in segments for instruction in segment.instructions]
+            self.ir_lines = [segment.ir_text for segment in segments if segment.ir_text]
+
+    def reuse_target(self, previous):
+        """Take over previous's optimized IR and target code if its IR is the same as this result's."""
+        if (previous is None or previous.completed != len(PHASES) - 1 or self.completed != PHASES.index('intermediate')
+                or previous.optimize != self.optimize or previous.register_count != self.register_count
+                or previous.ir_lines != self.ir_lines):
+            return
+        self.optimized_instructions = previous.optimized_instructions
+        self.optimization_report = previous.optimization_report
+        self.machine_code = previous.machine_code
+        self.target_stats = previous.target_stats
+        self.target_lines = previous.target_lines
+        self.completed = previous.completed
+
+    def locate_error(self, segment):
+        # Compile the failing segment again where it really is so the message
+        # carries the right line and column.
+        try:
+            semantic_analysis(syntax_analysis(tokenize(segment.unit.text, segment.line, segment.column)))
+        except (SyntaxError, RuntimeError) as e:
+            return e
+        return RuntimeError("Incremental compilation lost track of an error.")
+
+    def eof_token(self):
+        # The lexer puts EOF at the column of its last match, which for a
+        # program ending in ';' is the ';' itself.
+        last = self.segments[-1] if self.segments else None
+        if last is None or not last.unit.text:
+            if len(self.segments) < 2:
+                return ('EOF', None, 1, 1)
+            last = self.segments[-2]
+            end_offset, end_line, end_column = last.end()
+            return ('EOF', None, end_line, end_column - 1)
+        kind, value, line, column = last.unit.eof
+        return (kind, value, line + last.line - 1, column)
+
+    def section_lines(self, phase):
+        if phase == 'source':
+            # By line, so that changed_range can find the edited ones.
+            return self.source_code.split('\n')
+        elif phase == 'tokens' and self.run(phase):
+            return self.token_lines
+        elif phase in ('syntax', 'semantic') and self.run(phase):
+            return [line for segment in self.segments for line in segment.unit.section_lines(phase)]
+        elif phase == 'intermediate' and self.run(phase):
+            return self.ir_lines
+        elif phase == 'target' and self.run(phase):
+            if self.target_lines is None:
+                self.target_lines = [format_machine_line(line) for line in self.machine_code]
+            return self.target_lines
+        return super().section_lines(phase)
+
+def changed_range(old_pieces, new_pieces):
+    """Where two reports, given as pieces joined with newlines, differ.
+
+    Returns (first_line, last_line, pieces): replacing lines first_line to
+    last_line - 1 (counted from 0) of the old report with the lines of
+    pieces gives the new one. Equal pieces at either end are skipped by
+    comparing them, which is cheap for the strings an IncrementalResult
+    takes over from earlier updates.
+    """
+    limit = min(len(old_pieces), len(new_pieces))
+    prefix = 0
+    while prefix < limit and old_pieces[prefix] == new_pieces[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_pieces[-1 - suffix] == new_pieces[-1 - suffix]:
+        suffix += 1
+    first_line = count_lines(old_pieces[:prefix])
+    last_line = first_line + count_lines(old_pieces[prefix:len(old_pieces) - suffix])
+    return first_line, last_line, new_pieces[prefix:len(new_pieces) - suffix]
+
+def count_lines(pieces):
+    return sum(map(str.count, pieces, repeat('\n'))) + len(pieces)
+
+def changed_ranges(old_sections, new_sections):
+    """changed_range for reports given as lists of (phase, pieces), section by section.
+
+    Returns the changed ranges top to bottom, with at least one unchanged
+    line between two of them. Sections are compared with the section of
+    the same phase; from the first phase that is missing on one side, the
+    rest of both reports is compared as a whole.
+    """
+    common = 0
+    while (common < min(len(old_sections), len(new_sections))
+           and old_sections[common][0] == new_sections[common][0]):
+        common += 1
+    pairs = [(old_sections[i][1], new_sections[i][1]) for i in range(common)]
+    pairs.append(([piece for _, pieces in old_sections[common:] for piece in pieces],
+                  [piece for _, pieces in new_sections[common:] for piece in pieces]))
+    ranges = []
+    line = 0
+    for old_pieces, new_pieces in pairs:
+        first_line, last_line, pieces = changed_range(old_pieces, new_pieces)
+        if first_line != last_line or pieces:
+            first_line += line
+            last_line += line
+            if ranges and ranges[-1][1] == first_line:
+                ranges[-1] = (ranges[-1][0], last_line, ranges[-1][2] + pieces)
+            else:
+                ranges.append((first_line, last_line, pieces))
+        line += count_lines(old_pieces)
+    return ranges
+
+class IncrementalCompiler:
+    """Recompiles a buffer that changes by small edits, reusing unchanged statements.
+
+    update() takes the whole new source plus the range of lines (in the new
+    source) that were edited since the previous update; everything outside
+    that range must be unchanged. Without a range the whole source is
+    treated as edited, which still reuses any segment whose text is the same.
+    """
+
+    def __init__(self, register_count=DEFAULT_REGISTER_COUNT):
+        self.register_count = register_count
+        self.source_code = ''
+        self.line_count = 1
+        self.segments = []
+        self.result = None
+
+    def update(self, source_code, first_line=None, last_line=None, optimize=False):
+        line_count = source_code.count('\n') + 1
+        line_shift = line_count - self.line_count
+        offset_shift = len(source_code) - len(self.source_code)
+        if first_line is None:
+            first_line, last_line = 1, line_count
+        old_last_line = last_line - line_shift
+
+        # Segments wholly above the edited lines stay as they are, those wholly
+        # below are only moved. The trailing segment (after the last ';') is
+        # always cut again.
+        segments = self.segments
+        keep = 0
+        while keep < len(segments) - 1 and segments[keep].last_line() < first_line:
+            keep += 1
+        below = len(segments)
+        while below > keep and segments[below - 1].line > old_last_line:
+            below -= 1
+        reusable = {unit_key(segment.unit.text, segment.column): segment.unit for segment in segments[keep:below]}
+        suffix = segments[below:]
+        for segment in suffix:
+            segment.offset += offset_shift
+            segment.line += line_shift
+
+        if keep:
+            offset, line, column = segments[keep - 1].end()
+        else:
+            offset, line, column = 0, 1, 1
+        end = suffix[0].offset if suffix else len(source_code)
+        middle, rest = split_segments(source_code[offset:end], offset, line, column, reusable)
+        while rest and suffix:
+            # A ';' was deleted, so the edited text runs on into the next segment.
+            offset, line, column = middle[-1].end() if middle else (offset, line, column)
+            end = suffix[1].offset if len(suffix) > 1 else len(source_code)
+            suffix = suffix[1:]
+            more, rest = split_segments(source_code[offset:end], offset, line, column, reusable)
+            middle.extend(more)
+        if not suffix:
+            start = middle[-1].end() if middle else (offset, line, column)
+            middle.append(Segment(StatementUnit(rest, start[2]), *start))
+
+        self.segments = segments[:keep] + middle + suffix
+        self.source_code = source_code
+        self.line_count = line_count
+        temp_counter = 1
+        for segment in self.segments:
+            segment.place_temps(temp_counter)
+            temp_counter += segment.unit.temp_count
+        result = IncrementalResult(source_code, self.segments, self.register_count, optimize)
+        result.reuse_target(self.result)
+        self.result = result
+        return result
+
+class DirtyLines:
+    """Accumulates the range of edited lines between two updates.
+
+    Call inserted()/deleted() with line numbers as they are at the time of
+    each edit; take() returns (first_line, last_line) in the current text,
+    or (None, None) if nothing was edited, and resets the range.
+    """
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+
+    def inserted(self, line, newlines):
+        if self.first is None:
+            self.first, self.last = line, line + newlines
+            return
+        if self.first > line:
+            self.first += newlines
+        if self.last >= line:
+            self.last += newlines
+        self.first = min(self.first, line)
+        self.last = max(self.last, line + newlines)
+
+    def deleted(self, first_line, last_line):
+        removed = last_line - first_line
+        if self.first is None:
+            self.first, self.last = first_line, first_line
+            return
+        if self.last > last_line:
+            self.last -= removed
+        elif self.last >= first_line:
+            self.last = first_line
+        if self.first > last_line:
+            self.first -= removed
+        elif self.first > first_line:
+            self.first = first_line
+        self.first = min(self.first, first_line)
+        self.last = max(self.last, first_line)
+
+    def take(self):
+        first, last = self.first, self.last
+        self.first = self.last = None
+        return first, last
@@ -0,0 +1,136 @@
+import random
+import threading
+import time
+
+from .ast_nodes import BINARY_OP
+
+# ------------------------
+# Instrumentation
+# ------------------------
+# A CompilationResult can record wall time, CPU time, allocated bytes and an
+# item count for every phase it runs. Nothing is measured unless the result
+# is created with profile=True or picked by set_profile_sampling(), so an
+# unprofiled compile pays one `is None` check per phase.
+profile_sample_rate = 0.0
+
+def set_profile_sampling(rate):
+    """Profile a random fraction (0.0 to 1.0) of the results created with profile=None."""
+    global profile_sample_rate
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError("Profile sampling rate must be between 0 and 1.")
+    profile_sample_rate = rate
+
+def sample_profile():
+    return profile_sample_rate > 0.0 and random.random() < profile_sample_rate
+
+# tracemalloc is process-wide, so it is kept on while any profiled result is
+# running and byte counts may include allocations made by other threads. It
+# is imported on first use because importing it also loads pickle.
+tracing_lock = threading.Lock()
+tracing_users = 0
+
+def start_tracing():
+    global tracing_users
+    import tracemalloc
+    with tracing_lock:
+        if tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            tracing_users = 1
+        elif tracing_users:
+            tracing_users += 1
+
+def stop_tracing():
+    global tracing_users
+    import tracemalloc
+    with tracing_lock:
+        if tracing_users:
+            tracing_users -= 1
+            if tracing_users == 0:
+                tracemalloc.stop()
+
+def measure(function, *args):
+    """Call function(*args) and return what it cost; tracing must already be on."""
+    import tracemalloc
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    function(*args)
+    cpu = time.thread_time() - cpu
+    wall = time.perf_counter() - wall
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+        'allocated_bytes': max(0, peak - baseline),  # high-water mark above the starting point
+        'retained_bytes': current - baseline,
+    }
+
+def count_nodes(ast_list):
+    count = 0
+    stack = [ast.expression for ast in ast_list]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.kind == BINARY_OP:
+            stack.append(node.left)
+            stack.append(node.right)
+    return count + len(ast_list)
+
+WALL_TIME_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class MetricsRegistry:
+    """Running totals over profiled results, exported in the Prometheus text format."""
+
+    def __init__(self, buckets=WALL_TIME_BUCKETS):
+        self.buckets = buckets
+        self.phases = {}
+        self.results = 0
+        self.lock = threading.Lock()
+
+    def record(self, metrics):
+        with self.lock:
+            self.results += 1
+            for phase, sample in metrics.items():
+                totals = self.phases.get(phase)
+                if totals is None:
+                    totals = self.phases[phase] = {
+                        'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                        'allocated_bytes': 0, 'items': 0, 'buckets': [0] * len(self.buckets),
+                    }
+                totals['count'] += 1
+                totals['wall_seconds'] += sample['wall_seconds']
+                totals['cpu_seconds'] += sample['cpu_seconds']
+                totals['allocated_bytes'] += sample['allocated_bytes']
+                totals['items'] += sample['items']
+                for index, bound in enumerate(self.buckets):
+                    if sample['wall_seconds'] <= bound:
+                        totals['buckets'][index] += 1
+
+    def render(self):
+        with self.lock:
+            phases = {phase: dict(totals, buckets=list(totals['buckets'])) for phase, totals in self.phases.items()}
+            results = self.results
+        lines = [
+            "# HELP compiler_profiled_results_total Compilations whose phases were profiled.",
+            "# TYPE compiler_profiled_results_total counter",
+            f"compiler_profiled_results_total {results}",
+            "# HELP compiler_phase_wall_seconds Wall-clock time spent in each compiler phase.",
+            "# TYPE compiler_phase_wall_seconds histogram",
+        ]
+        for phase, totals in phases.items():
+            for bound, count in zip(self.buckets, totals['buckets']):
+                lines.append(f'compiler_phase_wall_seconds_bucket{{phase="{phase}",le="{bound}"}} {count}')
+            lines.append(f'compiler_phase_wall_seconds_bucket{{phase="{phase}",le="+Inf"}} {totals["count"]}')
+            lines.append(f'compiler_phase_wall_seconds_sum{{phase="{phase}"}} {totals["wall_seconds"]}')
+            lines.append(f'compiler_phase_wall_seconds_count{{phase="{phase}"}} {totals["count"]}')
+        for name, key, help_text in (
+            ('compiler_phase_cpu_seconds_total', 'cpu_seconds', "CPU time spent in each compiler phase."),
+            ('compiler_phase_allocated_bytes_total', 'allocated_bytes', "Peak bytes allocated by each compiler phase, summed."),
+            ('compiler_phase_items_total', 'items', "Tokens, AST nodes or instructions produced by each compiler phase."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for phase, totals in phases.items():
+                lines.append(f'{name}{{phase="{phase}"}} {totals[key]}')
+        return "\n".join(lines) + "\n"
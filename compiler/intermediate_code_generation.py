@@ -0,0 +1,93 @@
+from sys import intern
+
+from .ast_nodes import NUMBER, IDENTIFIER, BINARY_OP, OPERATOR_SYMBOLS
+
+# ------------------------
+# Intermediate Code Generation
+# ------------------------
+# Three-address instructions reuse the operator opcodes from ast_nodes
+# (OP_ADD..OP_DIV); OP_COPY is a plain `dest = src1`.
+OP_COPY = 4
+
+class Temp:
+    """A compiler temporary such as t3, kept distinct from program variables."""
+    __slots__ = ('number',)
+
+    def __init__(self, number):
+        self.number = number
+
+    def __eq__(self, other):
+        return isinstance(other, Temp) and other.number == self.number
+
+    def __hash__(self):
+        return hash(('t', self.number))
+
+    def __str__(self):
+        return f"t{self.number}"
+
+    __repr__ = __str__
+
+class Instruction:
+    """One three-address instruction.
+
+    Operands are Temps, interned variable names or numbers, so the
+    optimizer's dictionary lookups on them are cheap.
+    """
+    __slots__ = ('op', 'dest', 'src1', 'src2')
+
+    def __init__(self, op, dest, src1, src2=None):
+        self.op = op
+        self.dest = dest
+        self.src1 = src1
+        self.src2 = src2
+
+    def __str__(self):
+        if self.op == OP_COPY:
+            return f"{self.dest} = {self.src1}"
+        return f"{self.dest} = {self.src1} {OPERATOR_SYMBOLS[self.op]} {self.src2}"
+
+    def __repr__(self):
+        return f"Instruction({str(self)!r})"
+
+def generate_statement(ast, instructions, temp_counter=1):
+    """Append the instructions for one assignment; returns the next free temp number."""
+    # Post-order walk with an explicit stack; operands holds the temp, name or
+    # literal each finished subtree evaluates to.
+    operands = []
+    stack = [(ast.expression, False)]
+    while stack:
+        node, visited = stack.pop()
+        kind = node.kind
+        if kind == NUMBER:
+            operands.append(node.value)
+        elif kind == IDENTIFIER:
+            operands.append(intern(node.name))
+        elif kind == BINARY_OP:
+            if not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            right = operands.pop()
+            left = operands.pop()
+            temp = Temp(temp_counter)
+            temp_counter += 1
+            instructions.append(Instruction(node.op, temp, left, right))
+            operands.append(temp)
+        else:
+            raise RuntimeError("Unknown node type in code generation.")
+    instructions.append(Instruction(OP_COPY, intern(ast.target), operands[0]))
+    return temp_counter
+
+def generate_instructions(ast_list):
+    instructions = []
+    temp_counter = 1
+    for ast in ast_list:
+        temp_counter = generate_statement(ast, instructions, temp_counter)
+    return instructions
+
+def format_instructions(instructions):
+    return "\n".join(str(instruction) for instruction in instructions)
+
+def intermediate_code_generation(ast_list):
+    return format_instructions(generate_instructions(ast_list))
@@ -0,0 +1,107 @@
+import re
+from array import array
+
+# ------------------------
+# Lexical Analysis
+# ------------------------
+TOKEN_SPECIFICATION = [
+    ('NUMBER',   r'\d+(\.\d+)?'),
+    ('ID',       r'[A-Za-z_]\w*'),
+    ('ASSIGN',   r'='),
+    ('PLUS',     r'\+'),
+    ('MINUS',    r'-'),
+    ('MUL',      r'\*'),
+    ('DIV',      r'/'),
+    ('LPAREN',   r'\('),
+    ('RPAREN',   r'\)'),
+    ('SEMI',     r';'),
+    ('SKIP',     r'[ \t]+'),
+    ('NEWLINE',  r'\n'),
+    ('MISMATCH', r'.'),
+]
+
+# Compiled once at import time instead of on every call.
+TOKEN_REGEX = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_SPECIFICATION))
+
+# Small integer codes for the token kinds kept in a TokenStream.
+TOKEN_KINDS = ('EOF', 'NUMBER', 'ID', 'ASSIGN', 'PLUS', 'MINUS', 'MUL', 'DIV', 'LPAREN', 'RPAREN', 'SEMI')
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_KINDS)}
+
+class TokenStream:
+    """Tokens stored as parallel arrays.
+
+    Kinds are one-byte codes, positions are unsigned ints and values are kept
+    as (start, end) offsets into the source, so a token costs a few bytes
+    instead of a tuple and a string. Indexing or iterating still yields the
+    usual (kind, value, line, column) tuples.
+    """
+    __slots__ = ('source', 'kinds', 'starts', 'ends', 'lines', 'columns')
+
+    def __init__(self, source_code):
+        self.source = source_code
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        self.columns = array('I')
+
+    def append(self, kind_code, start, end, line, column):
+        self.kinds.append(kind_code)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+        self.columns.append(column)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def kind(self, index):
+        return TOKEN_KINDS[self.kinds[index]]
+
+    def value(self, index):
+        if self.kinds[index] == 0:
+            return None
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def __getitem__(self, index):
+        return (self.kind(index), self.value(index), self.lines[index], self.columns[index])
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+def _scan(source_code, first_line=1, first_column=1):
+    # Yields (kind, start, end, line, column) for every significant token.
+    # first_line/first_column give the position of source_code[0] when it is
+    # a slice of a larger program.
+    line_num = first_line
+    line_start = 1 - first_column
+    column = first_column
+    for mo in TOKEN_REGEX.finditer(source_code):
+        kind = mo.lastgroup
+        column = mo.start() - line_start + 1
+        if kind == 'SKIP':
+            continue
+        elif kind == 'NEWLINE':
+            line_num += 1
+            line_start = mo.end()
+        elif kind == 'MISMATCH':
+            raise RuntimeError(f'Lexical Error: Unexpected character {mo.group()!r} at line {line_num} column {column}')
+        else:
+            yield kind, mo.start(), mo.end(), line_num, column
+    yield 'EOF', len(source_code), len(source_code), line_num, column
+
+def iter_tokens(source_code, first_line=1, first_column=1):
+    """Yield (kind, value, line, column) tokens one at a time, ending with EOF."""
+    for kind, start, end, line, column in _scan(source_code, first_line, first_column):
+        yield (kind, source_code[start:end] if kind != 'EOF' else None, line, column)
+
+def tokenize(source_code, first_line=1, first_column=1):
+    """Lex the whole source into a compact TokenStream."""
+    stream = TokenStream(source_code)
+    for kind, start, end, line, column in _scan(source_code, first_line, first_column):
+        stream.append(KIND_CODES[kind], start, end, line, column)
+    return stream
+
+def lexical_analysis(source_code):
+    return list(iter_tokens(source_code))
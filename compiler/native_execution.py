@@ -0,0 +1,141 @@
+import ast
+import hashlib
+import keyword
+import threading
+from collections import OrderedDict
+
+from .ast_nodes import NUMBER, IDENTIFIER, OP_ADD, OP_SUB, OP_MUL, OP_DIV
+from .lexical_analysis import tokenize
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis
+
+# ------------------------
+# Native Execution
+# ------------------------
+# The folded ASTs are lowered to the Python AST of one function,
+#   def program(x, y):
+#       a = x * 2
+#       b = a + y
+#       return {'a': a, 'b': b}
+# which compile() turns into an ordinary code object, so the program then
+# runs at the speed of CPython's own bytecode. Free identifiers (read before
+# they are assigned) become the parameters. Variables keep their names
+# unless they are Python keywords or start with '_'; those are renamed to
+# _v<n>. Subexpressions deeper than MAX_EXPRESSION_DEPTH are assigned to
+# _t<n> temporaries first, because CPython's compiler recurses once per
+# nesting level.
+MAX_EXPRESSION_DEPTH = 64
+PROGRAM_CACHE_SIZE = 256
+
+PYTHON_OPERATORS = {OP_ADD: ast.Add, OP_SUB: ast.Sub, OP_MUL: ast.Mult, OP_DIV: ast.Div}
+# Every generated node sits on line 1; setting it up front is much cheaper
+# than ast.fix_missing_locations() on a tree of a few hundred thousand nodes.
+LOCATION = {'lineno': 1, 'col_offset': 0, 'end_lineno': 1, 'end_col_offset': 0}
+
+class NativeProgram:
+    """A compiled program: call it with a mapping of input values to get the assigned targets."""
+    __slots__ = ('function', 'parameters', 'targets')
+
+    def __init__(self, function, parameters, targets):
+        self.function = function      # the generated Python function
+        self.parameters = parameters  # free variables, in the order the function takes them
+        self.targets = targets        # assigned variables, in order of first assignment
+
+    def __call__(self, inputs=None):
+        inputs = inputs or {}
+        missing = [name for name in self.parameters if name not in inputs]
+        if missing:
+            raise RuntimeError(f"Runtime Error: No value given for {', '.join(missing)}.")
+        try:
+            return self.function(*[inputs[name] for name in self.parameters])
+        except ZeroDivisionError:
+            raise RuntimeError("Runtime Error: Division by zero.") from None
+
+def lower_to_python(ast_list, name='program'):
+    """Build a NativeProgram from folded ASTs (the output of semantic_analysis)."""
+    local_names = {}
+    parameters = []
+    targets = {}
+    body = []
+    temp_count = 0
+
+    def local(variable):
+        python_name = local_names.get(variable)
+        if python_name is None:
+            if keyword.iskeyword(variable) or variable.startswith('_'):
+                python_name = f"_v{len(local_names)}"
+            else:
+                python_name = variable
+            local_names[variable] = python_name
+        return python_name
+
+    def lower(expression):
+        nonlocal temp_count
+        # Post-order with an explicit stack; each entry in `done` is
+        # (python node, depth).
+        done = []
+        stack = [(expression, False)]
+        while stack:
+            node, expanded = stack.pop()
+            kind = node.kind
+            if kind == NUMBER:
+                done.append((ast.Constant(node.value, **LOCATION), 1))
+            elif kind == IDENTIFIER:
+                if node.name not in local_names:
+                    parameters.append(node.name)
+                done.append((ast.Name(local(node.name), ast.Load(), **LOCATION), 1))
+            elif not expanded:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                right, right_depth = done.pop()
+                left, left_depth = done.pop()
+                python_node = ast.BinOp(left, PYTHON_OPERATORS[node.op](), right, **LOCATION)
+                depth = max(left_depth, right_depth) + 1
+                if depth >= MAX_EXPRESSION_DEPTH:
+                    temp = f"_t{temp_count}"
+                    temp_count += 1
+                    body.append(ast.Assign([ast.Name(temp, ast.Store(), **LOCATION)], python_node, **LOCATION))
+                    python_node, depth = ast.Name(temp, ast.Load(), **LOCATION), 1
+                done.append((python_node, depth))
+        return done[0][0]
+
+    for statement in ast_list:
+        value = lower(statement.expression)
+        targets[statement.target] = None
+        body.append(ast.Assign([ast.Name(local(statement.target), ast.Store(), **LOCATION)], value, **LOCATION))
+
+    body.append(ast.Return(ast.Dict([ast.Constant(target, **LOCATION) for target in targets],
+                                    [ast.Name(local_names[target], ast.Load(), **LOCATION) for target in targets],
+                                    **LOCATION), **LOCATION))
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(local_names[parameter], **LOCATION) for parameter in parameters],
+                              kwonlyargs=[], kw_defaults=[], defaults=[])
+    function = ast.FunctionDef(name=name, args=arguments, body=body, decorator_list=[], returns=None,
+                               type_comment=None, **LOCATION)
+    module = ast.Module(body=[function], type_ignores=[])
+    namespace = {'__builtins__': {}}
+    exec(compile(module, f"<{name}>", 'exec'), namespace)
+    return NativeProgram(namespace[name], tuple(parameters), tuple(targets))
+
+program_cache = OrderedDict()
+program_cache_lock = threading.Lock()
+
+def native_program(source_code):
+    """Compile source to a NativeProgram, reusing the one built for the same source (by SHA-256)."""
+    key = hashlib.sha256(source_code.encode('utf-8', 'surrogatepass')).hexdigest()
+    with program_cache_lock:
+        program = program_cache.get(key)
+        if program is not None:
+            program_cache.move_to_end(key)
+            return program
+    program = lower_to_python(semantic_analysis(syntax_analysis(tokenize(source_code))))
+    with program_cache_lock:
+        program_cache[key] = program
+        while len(program_cache) > PROGRAM_CACHE_SIZE:
+            program_cache.popitem(last=False)
+    return program
+
+def execute_native(source_code, inputs=None):
+    """Compile (or reuse) source as a Python function and run it; compiler errors propagate as usual."""
+    return native_program(source_code)(inputs)
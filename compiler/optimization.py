@@ -0,0 +1,200 @@
+from .ast_nodes import OP_ADD, OP_SUB, OP_MUL, OP_DIV
+from .intermediate_code_generation import Instruction, Temp, OP_COPY
+
+# ------------------------
+# IR Optimization
+# ------------------------
+# Every pass takes the whole program's instruction list (straight-line code)
+# and returns (new instructions, number of changes). Program variables are
+# observable when the program ends; temporaries are not.
+COMMUTATIVE = (OP_ADD, OP_MUL)
+
+def is_constant(operand):
+    return isinstance(operand, (int, float))
+
+def is_literal(operand, number):
+    # Same type too: x + 0.0 is a float even when x is an int.
+    return type(operand) is type(number) and operand == number
+
+def may_raise(instruction):
+    """Whether an instruction can divide by zero, so it must run even if its result is unused."""
+    return instruction.op == OP_DIV and not (is_constant(instruction.src2) and instruction.src2 != 0)
+
+def operand_key(operand):
+    # Total order over mixed operands, used to put commutative operands in a
+    # canonical order.
+    if is_constant(operand):
+        return (0, operand, type(operand).__name__)
+    if isinstance(operand, Temp):
+        return (1, operand.number, '')
+    return (2, 0, operand)
+
+def fold_constants(op, left, right):
+    if op == OP_ADD:
+        return left + right
+    elif op == OP_SUB:
+        return left - right
+    elif op == OP_MUL:
+        return left * right
+    # Division by zero is left for run time, as semantic analysis only
+    # rejects it inside a single literal expression.
+    return left / right if right != 0 else None
+
+def simplify_algebra(instructions):
+    """Rewrite x+0, x-0 and x*1 (either operand order) and fold constant operands.
+
+    x/1 and x*0 are left alone: operand types are only known at run time,
+    and x/1 is always a float while x*0 is 0.0 (or nan) for a float x.
+    """
+    result = []
+    changes = 0
+    for instruction in instructions:
+        op, left, right = instruction.op, instruction.src1, instruction.src2
+        replacement = None
+        if op != OP_COPY:
+            if is_constant(left) and is_constant(right):
+                replacement = fold_constants(op, left, right)
+            elif op in (OP_ADD, OP_SUB) and is_literal(right, 0):
+                replacement = left
+            elif op == OP_ADD and is_literal(left, 0):
+                replacement = right
+            elif op == OP_MUL and is_literal(right, 1):
+                replacement = left
+            elif op == OP_MUL and is_literal(left, 1):
+                replacement = right
+        if replacement is None:
+            result.append(instruction)
+        else:
+            result.append(Instruction(OP_COPY, instruction.dest, replacement))
+            changes += 1
+    return result, changes
+
+def propagate_copies(instructions):
+    """Replace uses of `x = y` targets with y for as long as neither is reassigned."""
+    copies = {}
+    result = []
+    changes = 0
+    for instruction in instructions:
+        src1 = copies.get(instruction.src1, instruction.src1)
+        src2 = copies.get(instruction.src2, instruction.src2) if instruction.src2 is not None else None
+        if src1 is not instruction.src1 or src2 is not instruction.src2:
+            instruction = Instruction(instruction.op, instruction.dest, src1, src2)
+            changes += 1
+        dest = instruction.dest
+        if not isinstance(dest, Temp):
+            # dest now holds a new value: forget copies of it and copies from it.
+            copies.pop(dest, None)
+            for name in [name for name, source in copies.items() if source == dest and not is_constant(source)]:
+                del copies[name]
+        if instruction.op == OP_COPY and instruction.src1 != dest:
+            copies[dest] = instruction.src1
+        result.append(instruction)
+    return result, changes
+
+def eliminate_common_subexpressions(instructions):
+    """Turn a recomputation of an available expression into a copy of its earlier result."""
+    available = {}
+    result = []
+    changes = 0
+    for instruction in instructions:
+        op, dest = instruction.op, instruction.dest
+        key = None
+        if op != OP_COPY:
+            left, right = instruction.src1, instruction.src2
+            if op in COMMUTATIVE and operand_key(right) < operand_key(left):
+                left, right = right, left
+            key = (op, operand_key(left), operand_key(right))
+            holder = available.get(key)
+            if holder is not None:
+                instruction = Instruction(OP_COPY, dest, holder)
+                changes += 1
+        if not isinstance(dest, Temp):
+            # Expressions that read dest, or were only held by dest, are stale.
+            dest_key = operand_key(dest)
+            for stale in [k for k, holder in available.items() if holder == dest or dest_key in k[1:]]:
+                del available[stale]
+            # After x = x + 1, x no longer holds what the expression reads.
+            if key is not None and dest_key in key[1:]:
+                key = None
+        if key is not None and instruction.op != OP_COPY:
+            available[key] = dest
+        result.append(instruction)
+    return result, changes
+
+def eliminate_dead_code(instructions):
+    """Drop unused temporaries, `x = x` copies and assignments overwritten before being read.
+
+    Divisions that may raise are kept, so the program fails where the
+    unoptimized one does.
+    """
+    live_temps = set()
+    dead_variables = set()  # assigned later with no read in between
+    kept = []
+    changes = 0
+    for instruction in reversed(instructions):
+        dest = instruction.dest
+        if instruction.op == OP_COPY and instruction.src1 == dest:
+            changes += 1
+            continue
+        if isinstance(dest, Temp):
+            dead = dest not in live_temps
+            live_temps.discard(dest)
+        else:
+            dead = dest in dead_variables
+            dead_variables.add(dest)
+        if dead and not may_raise(instruction):
+            changes += 1
+            continue
+        for operand in (instruction.src1, instruction.src2):
+            if isinstance(operand, Temp):
+                live_temps.add(operand)
+            elif operand is not None and not is_constant(operand):
+                dead_variables.discard(operand)
+        kept.append(instruction)
+    kept.reverse()
+    return kept, changes
+
+DEFAULT_PASSES = (
+    simplify_algebra,
+    propagate_copies,
+    eliminate_common_subexpressions,
+    propagate_copies,
+    eliminate_dead_code,
+)
+
+class PassManager:
+    """Runs a sequence of passes repeatedly until the program stops changing."""
+
+    def __init__(self, passes=DEFAULT_PASSES, max_rounds=8):
+        self.passes = passes
+        self.max_rounds = max_rounds
+
+    def run(self, instructions):
+        """Returns (optimized instructions, report)."""
+        before = len(instructions)
+        per_pass = {}
+        rounds = 0
+        for rounds in range(1, self.max_rounds + 1):
+            round_changes = 0
+            for optimization_pass in self.passes:
+                count = len(instructions)
+                instructions, changes = optimization_pass(instructions)
+                stats = per_pass.setdefault(optimization_pass.__name__, {'changes': 0, 'removed': 0})
+                stats['changes'] += changes
+                stats['removed'] += count - len(instructions)
+                round_changes += changes
+            if not round_changes:
+                break
+        report = {'before': before, 'after': len(instructions), 'rounds': rounds, 'passes': per_pass}
+        return instructions, report
+
+def optimize(instructions, passes=DEFAULT_PASSES):
+    return PassManager(passes).run(instructions)
+
+def format_optimization_report(report):
+    lines = [f"// {report['before']} -> {report['after']} instructions after {report['rounds']} round(s)"]
+    for name, stats in report['passes'].items():
+        lines.append(f"//   {name}: {stats['changes']} change(s), {stats['removed']} removed")
+    if 'target_before' in report:
+        lines.append(f"// target code: {report['target_before']} -> {report['target_after']} instructions")
+    return lines
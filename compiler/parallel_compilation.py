@@ -0,0 +1,214 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .ast_nodes import format_node
+from .lexical_analysis import tokenize, TokenStream
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis
+from .intermediate_code_generation import generate_statement, Instruction, Temp
+from .code_generation import DEFAULT_REGISTER_COUNT
+from .compile_source import CompilationResult, PHASES
+
+# ------------------------
+# Parallel Compilation
+# ------------------------
+# One large program is cut after ';' into chunks of similar size. Each
+# worker process lexes, parses, folds and generates IR for its chunk as if
+# it were a program of its own: tokens carry their real line and column
+# (tokenize is told where the chunk starts) and temporaries are numbered
+# from t1. The workers also render their lines of the tokens, syntax and
+# semantic sections, and send those back with the tokens and the IR rather
+# than the ASTs. The parent merges the chunks in order, shifting each
+# chunk's temporaries by the number used before it, and keeps the error
+# the serial pipeline would have stopped at: the first lexical error
+# anywhere, else the first syntax error, else the first semantic one.
+# Optimization and target code generation still run on the whole program.
+#
+# A ';' always ends a statement or is a syntax error, so a parser starting
+# after one is in the same state as the serial parser there.
+MIN_CHUNK_SIZE = 64 * 1024  # characters; smaller programs are compiled serially
+CHUNKS_PER_WORKER = 2
+
+def split_program(source_code, chunks):
+    """Cut source after ';' into at most `chunks` pieces; returns [(offset, line, column, text)]."""
+    pieces = []
+    start, line, column = 0, 1, 1
+    size = len(source_code)
+    for index in range(1, chunks):
+        cut = source_code.find(';', max(start, size * index // chunks)) + 1
+        # The last piece keeps at least the final ';', so the lexer places
+        # EOF exactly where it does for the whole program.
+        if cut == 0 or cut >= size:
+            break
+        text = source_code[start:cut]
+        pieces.append((start, line, column, text))
+        newlines = text.count('\n')
+        if newlines:
+            line += newlines
+            column = len(text) - text.rfind('\n')
+        else:
+            column += len(text)
+        start = cut
+    pieces.append((start, line, column, source_code[start:]))
+    return pieces
+
+def encode_operands(operands):
+    # Temps become (1, number), anything else (0, operand), as two columns.
+    kinds = bytearray()
+    values = []
+    for operand in operands:
+        if isinstance(operand, Temp):
+            kinds.append(1)
+            values.append(operand.number)
+        else:
+            kinds.append(0)
+            values.append(operand)
+    return bytes(kinds), values
+
+def compile_piece(offset, line, column, text, last):
+    """Run the front end on one piece; returns (failed phase, error, tokens, section texts, IR, temp count).
+
+    The section texts are the piece's lines of the tokens, syntax and
+    semantic sections, for the phases it got through.
+    """
+    phase = 'tokens'
+    tokens = instructions = None
+    texts = []
+    temp_count = 0
+    error = None
+    try:
+        stream = tokenize(text, line, column)
+        # Only the last piece's EOF belongs to the program.
+        texts.append("\n".join(map(str, islice(stream, len(stream) if last else len(stream) - 1))))
+        phase = 'syntax'
+        ast_list = syntax_analysis(stream)
+        texts.append("\n".join(map(format_node, ast_list)))
+        phase = 'semantic'
+        folded_ast_list = semantic_analysis(ast_list)
+        texts.append("\n".join(map(format_node, folded_ast_list)))
+        instructions = []
+        temp_counter = 1
+        for ast in folded_ast_list:
+            temp_counter = generate_statement(ast, instructions, temp_counter)
+        temp_count = temp_counter - 1
+        instructions = (bytes(instruction.op for instruction in instructions),
+                        encode_operands([instruction.dest for instruction in instructions]),
+                        encode_operands([instruction.src1 for instruction in instructions]),
+                        encode_operands([instruction.src2 for instruction in instructions]))
+        phase = None
+    except (SyntaxError, RuntimeError) as e:
+        error = ('SyntaxError' if isinstance(e, SyntaxError) else 'RuntimeError', str(e))
+    if phase != 'tokens':
+        if not last:
+            for column_array in (stream.kinds, stream.starts, stream.ends, stream.lines, stream.columns):
+                column_array.pop()
+        starts = array('I', [start + offset for start in stream.starts])
+        ends = array('I', [end + offset for end in stream.ends])
+        tokens = tuple(data.tobytes() for data in (stream.kinds, starts, ends, stream.lines, stream.columns))
+    return phase, error, tokens, texts, instructions, temp_count
+
+class ParallelResult(CompilationResult):
+    """A CompilationResult merged from compile_piece outputs.
+
+    The tokens, syntax and semantic sections are rendered from the texts
+    the workers sent. ast_list and folded_ast_list are only parsed from the
+    merged tokens if something reads them.
+    """
+    section_texts = None  # phase -> the pieces' non-empty texts, in order
+
+    @property
+    def ast_list(self):
+        if self._ast_list is None and self.completed >= PHASES.index('syntax'):
+            self._ast_list = syntax_analysis(self.tokens)
+        return self._ast_list
+
+    @ast_list.setter
+    def ast_list(self, value):
+        self._ast_list = value
+
+    @property
+    def folded_ast_list(self):
+        if self._folded_ast_list is None and self.completed >= PHASES.index('semantic'):
+            self._folded_ast_list = semantic_analysis(self.ast_list)
+        return self._folded_ast_list
+
+    @folded_ast_list.setter
+    def folded_ast_list(self, value):
+        self._folded_ast_list = value
+
+    def section_lines(self, phase):
+        if self.section_texts is not None and phase in self.section_texts and self.run(phase):
+            return self.section_texts[phase]
+        return super().section_lines(phase)
+
+def merge_pieces(source_code, outputs, register_count=DEFAULT_REGISTER_COUNT, optimize=False):
+    """Assemble the outputs of compile_piece, in program order, into one ParallelResult.
+
+    outputs may be an iterator: each output is merged as soon as it
+    arrives, while later pieces are still being compiled.
+    """
+    result = ParallelResult(source_code, register_count, optimize, profile=False)
+    tokens = TokenStream(source_code)
+    instructions = []
+    temp_shift = 0
+    errors = {}  # phase -> the first error raised in it
+    section_texts = {'tokens': [], 'syntax': [], 'semantic': []}
+    for phase, error, encoded_tokens, texts, encoded_instructions, temp_count in outputs:
+        if phase is not None:
+            errors.setdefault(phase, error)
+        for section, text in zip(('tokens', 'syntax', 'semantic'), texts):
+            if text:
+                section_texts[section].append(text)
+        if encoded_tokens is not None:
+            for name, data in zip(('kinds', 'starts', 'ends', 'lines', 'columns'), encoded_tokens):
+                getattr(tokens, name).frombytes(data)
+        if errors:
+            continue
+        ops, dests, sources1, sources2 = encoded_instructions
+        temps = [None] + [Temp(number + temp_shift) for number in range(1, temp_count + 1)]
+        columns = [[temps[value] if kind else value for kind, value in zip(kinds, values)]
+                   for kinds, values in (dests, sources1, sources2)]
+        instructions.extend(map(Instruction, ops, *columns))
+        temp_shift += temp_count
+
+    result.completed = PHASES.index('intermediate')
+    for phase in ('tokens', 'syntax', 'semantic'):
+        if phase in errors:
+            result.completed = PHASES.index(phase) - 1
+            kind, message = errors[phase]
+            result.error = SyntaxError(message) if kind == 'SyntaxError' else RuntimeError(message)
+            break
+    result.section_texts = section_texts
+    if result.completed >= PHASES.index('tokens'):
+        result.tokens = tokens
+    if result.completed >= PHASES.index('intermediate'):
+        result.instructions = instructions
+    return result
+
+def compile_parallel(source_code, workers=None, executor=None, optimize=False, register_count=DEFAULT_REGISTER_COUNT,
+                     min_chunk_size=MIN_CHUNK_SIZE):
+    """Compile one program with its front end spread over a process pool.
+
+    Returns a CompilationResult that renders exactly like the serial one,
+    with the later phases run on demand as usual. The pool is a new one
+    sized by workers, or the executor passed in; workers (default: one per
+    core) also sets how many chunks are cut. Programs too small to give
+    every chunk min_chunk_size characters are compiled serially.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers * CHUNKS_PER_WORKER, len(source_code) // max(min_chunk_size, 1))
+    pieces = split_program(source_code, chunks) if workers > 1 and chunks > 1 else None
+    if pieces is None or len(pieces) == 1:
+        return CompilationResult(source_code, register_count, optimize)
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        lasts = [False] * (len(pieces) - 1) + [True]
+        return merge_pieces(source_code, executor.map(compile_piece, *zip(*pieces), lasts), register_count, optimize)
+    finally:
+        if own_executor:
+            executor.shutdown()
@@ -0,0 +1,44 @@
+from .ast_nodes import Number, BinaryOp, Assignment, BINARY_OP, NUMBER, OP_ADD, OP_SUB, OP_MUL
+
+# ------------------------
+# Semantic Analysis
+# ------------------------
+def fold_values(op, left, right):
+    if op == OP_ADD:
+        return left + right
+    elif op == OP_SUB:
+        return left - right
+    elif op == OP_MUL:
+        return left * right
+    if right == 0:
+        raise RuntimeError("Semantic Error: Division by zero.")
+    return left / right
+
+def fold(root):
+    # Post-order constant folding with an explicit stack; results holds the
+    # folded form of each finished subtree.
+    results = []
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if node.kind != BINARY_OP:
+            results.append(node)
+        elif not visited:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        else:
+            right = results.pop()
+            left = results.pop()
+            if left.kind == NUMBER and right.kind == NUMBER:
+                results.append(Number(fold_values(node.op, left.value, right.value)))
+            elif left is node.left and right is node.right:
+                results.append(node)
+            else:
+                results.append(BinaryOp(node.op, left, right))
+    return results[0]
+
+def semantic_analysis(ast_list):
+    # Returns new statements so the parser's ASTs are left untouched; folded
+    # trees share every subtree that did not change.
+    return [Assignment(ast.target, fold(ast.expression)) for ast in ast_list]
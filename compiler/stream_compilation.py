@@ -0,0 +1,97 @@
+from contextlib import ExitStack
+
+from .lexical_analysis import tokenize
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis
+from .intermediate_code_generation import generate_statement, format_instructions
+from .code_generation import code_generation, DEFAULT_REGISTER_COUNT
+
+# ------------------------
+# Streaming Compilation
+# ------------------------
+STREAM_CHUNK_SIZE = 1 << 16
+
+def iter_statement_blocks(source_file, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield (text, line, column) blocks of whole statements read from a text file.
+
+    Every block except the last ends on a ';', so no token or statement is
+    ever split. line/column give the position of text[0] in the file. Only
+    one chunk plus the unfinished statement carried over from the previous
+    chunk is held in memory.
+    """
+    carry = ''
+    line = 1
+    column = 1
+    while True:
+        chunk = source_file.read(chunk_size)
+        if not chunk:
+            break
+        cut = chunk.rfind(';')
+        if cut < 0:
+            carry += chunk
+            continue
+        block = carry + chunk[:cut + 1]
+        carry = chunk[cut + 1:]
+        yield block, line, column
+        newlines = block.count('\n')
+        if newlines:
+            line += newlines
+            column = len(block) - block.rfind('\n')
+        else:
+            column += len(block)
+    if carry:
+        yield carry, line, column
+
+def compile_stream(source_file, ir_file=None, target_file=None, chunk_size=STREAM_CHUNK_SIZE,
+                   register_count=DEFAULT_REGISTER_COUNT, optimize=False, progress=None, cancelled=None):
+    """Compile a program of any size block by block, writing IR and target code as it goes.
+
+    Temporaries are numbered across the whole program exactly as in
+    compile_source. Compilation stops at the first failing statement; its
+    message is returned in the summary instead of being raised. With
+    optimize, each block is optimized on its own, so every variable is
+    treated as live at the end of a block.
+
+    progress, if given, is called as progress(statements, characters) after
+    each block. cancelled (e.g. a threading.Event) is checked before each
+    block; once it is set, compilation stops and the summary says so.
+    """
+    statements = 0
+    characters = 0
+    temp_counter = 1
+    error = None
+    stopped = False
+    try:
+        for text, line, column in iter_statement_blocks(source_file, chunk_size):
+            if cancelled is not None and cancelled.is_set():
+                stopped = True
+                break
+            characters += len(text)
+            ast_list = semantic_analysis(syntax_analysis(tokenize(text, line, column)))
+            if not ast_list:
+                continue
+            instructions = []
+            for ast in ast_list:
+                temp_counter = generate_statement(ast, instructions, temp_counter)
+            if optimize:
+                from .optimization import optimize as optimize_instructions
+                instructions, _ = optimize_instructions(instructions)
+            if ir_file is not None:
+                ir_file.write(format_instructions(instructions) + "\n")
+            if target_file is not None:
+                target_file.write(code_generation(instructions, register_count) + "\n")
+            statements += len(ast_list)
+            if progress is not None:
+                progress(statements, characters)
+    except (SyntaxError, RuntimeError) as e:
+        error = str(e)
+    return {'statements': statements, 'temporaries': temp_counter - 1, 'error': error, 'cancelled': stopped}
+
+def compile_file(source_path, ir_path=None, target_path=None, chunk_size=STREAM_CHUNK_SIZE,
+                 register_count=DEFAULT_REGISTER_COUNT, optimize=False, progress=None, cancelled=None):
+    with ExitStack() as stack:
+        source_file = stack.enter_context(open(source_path, "r"))
+        ir_file = stack.enter_context(open(ir_path, "w")) if ir_path else None
+        target_file = stack.enter_context(open(target_path, "w")) if target_path else None
+        return compile_stream(source_file, ir_file, target_file, chunk_size, register_count, optimize,
+                              progress, cancelled)
@@ -0,0 +1,144 @@
+from .lexical_analysis import TokenStream, TOKEN_KINDS
+from .ast_nodes import Number, Identifier, BinaryOp, Assignment, OP_ADD, OP_SUB, OP_MUL, OP_DIV
+
+# ------------------------
+# Parser (Syntax Analysis)
+# ------------------------
+PRECEDENCE = {'PLUS': 1, 'MINUS': 1, 'MUL': 2, 'DIV': 2}
+OPERATOR_CODES = {'PLUS': OP_ADD, 'MINUS': OP_SUB, 'MUL': OP_MUL, 'DIV': OP_DIV}
+
+class Parser:
+    def __init__(self, tokens, factory=None):
+        self.index = 0
+        # With a NodeFactory (see expression_dag) repeated subexpressions are
+        # built once and shared; otherwise every occurrence is a new tree.
+        if factory is None:
+            self.make_number, self.make_identifier, self.make_binary = Number, Identifier, BinaryOp
+        else:
+            self.make_number, self.make_identifier, self.make_binary = factory.number, factory.identifier, factory.binary
+        if isinstance(tokens, TokenStream):
+            # Indexed mode: kinds are read straight from the stream's arrays.
+            self.stream = tokens
+            self.tokens = None
+            self.lookahead = None
+        else:
+            # Tokens may be a list or a lazy iterator such as iter_tokens(source);
+            # only one token of lookahead is ever held.
+            self.stream = None
+            self.tokens = iter(tokens)
+            self.lookahead = next(self.tokens, None)
+
+    def current_kind(self):
+        if self.stream is not None:
+            if self.index < len(self.stream):
+                return TOKEN_KINDS[self.stream.kinds[self.index]]
+            return 'EOF'
+        if self.lookahead is not None:
+            return self.lookahead[0]
+        return 'EOF'
+
+    def current_token(self):
+        if self.stream is not None:
+            if self.index < len(self.stream):
+                return self.stream[self.index]
+        elif self.lookahead is not None:
+            return self.lookahead
+        return ('EOF', None, -1, -1)
+
+    def error(self, expected):
+        token = self.current_token()
+        token_type, token_value, line, column = token
+        raise SyntaxError(f"Syntax Error: Expected {expected} at line {line} column {column}, got '{token_value}' ({token_type}).")
+
+    def eat(self, token_type):
+        if self.current_kind() == token_type:
+            token = self.current_token()
+            self.index += 1
+            if self.stream is None:
+                self.lookahead = next(self.tokens, None)
+            return token
+        else:
+            self.error(token_type)
+
+    def parse_program(self):
+        """Parse multiple statements until EOF."""
+        statements = []
+        while self.current_kind() != 'EOF':
+            while self.current_kind() == 'SEMI':
+                self.eat('SEMI')
+            if self.current_kind() == 'EOF':
+                break
+            stmt = self.statement()
+            statements.append(stmt)
+            if self.current_kind() == 'SEMI':
+                self.eat('SEMI')
+            else:
+                token = self.current_token()
+                raise SyntaxError(f"Syntax Error: Missing semicolon at line {token[2]} column {token[3]}.")
+        return statements
+
+    def statement(self):
+        # statement -> ID ASSIGN expression
+        token = self.eat('ID')
+        var_name = token[1]
+        self.eat('ASSIGN')
+        expr_node = self.expression()
+        return Assignment(var_name, expr_node)
+
+    def expression(self):
+        # expression -> term ((PLUS|MINUS) term)*
+        # term       -> factor ((MUL|DIV) factor)*
+        # factor     -> NUMBER | ID | LPAREN expression RPAREN
+        # Parsed with explicit operand/operator stacks (shunting-yard) so that
+        # deeply nested parentheses cannot exhaust the Python call stack.
+        operands = []
+        operators = []  # (opcode, precedence), or None for an open parenthesis
+        depth = 0
+        while True:
+            while self.current_kind() == 'LPAREN':
+                self.eat('LPAREN')
+                operators.append(None)
+                depth += 1
+            operands.append(self.factor())
+            kind = self.current_kind()
+            while kind == 'RPAREN' and depth:
+                while operators[-1] is not None:
+                    self.reduce(operands, operators)
+                operators.pop()
+                depth -= 1
+                self.eat('RPAREN')
+                kind = self.current_kind()
+            precedence = PRECEDENCE.get(kind)
+            if precedence is None:
+                if depth:
+                    self.error('RPAREN')
+                while operators:
+                    self.reduce(operands, operators)
+                return operands[0]
+            # Operators of equal precedence associate to the left.
+            while operators and operators[-1] is not None and operators[-1][1] >= precedence:
+                self.reduce(operands, operators)
+            operators.append((OPERATOR_CODES[kind], precedence))
+            self.eat(kind)
+
+    def reduce(self, operands, operators):
+        opcode = operators.pop()[0]
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(self.make_binary(opcode, left, right))
+
+    def factor(self):
+        # factor -> NUMBER | ID (parentheses are handled by expression)
+        kind = self.current_kind()
+        if kind == 'NUMBER':
+            token = self.eat('NUMBER')
+            return self.make_number(float(token[1]) if '.' in token[1] else int(token[1]))
+        elif kind == 'ID':
+            token = self.eat('ID')
+            return self.make_identifier(token[1])
+        else:
+            self.error("NUMBER, identifier, or '('")
+
+def syntax_analysis(tokens, factory=None):
+    parser = Parser(tokens, factory)
+    return parser.parse_program()
@@ -0,0 +1,127 @@
+from .ast_nodes import OP_ADD, OP_SUB, OP_MUL, OP_DIV
+from .lexical_analysis import tokenize
+from .syntax_analysis import syntax_analysis
+from .semantic_analysis import semantic_analysis
+from .intermediate_code_generation import generate_instructions, OP_COPY, Temp
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ------------------------
+# Vectorized Evaluation
+# ------------------------
+# Runs the three-address code once over whole NumPy arrays instead of once
+# per input row. Every free identifier is bound to an array (or a scalar,
+# which broadcasts) and every instruction becomes one array operation.
+#
+# What a division by zero does is chosen per call:
+#   'raise' - RuntimeError naming the first failing element, as at compile time
+#   'nan'   - those elements become nan
+#   'inf'   - IEEE results (+-inf, nan for 0/0)
+#   a number - those elements become that number
+DIVISION_POLICIES = ('raise', 'nan', 'inf')
+
+ARRAY_OPERATIONS = {}
+if np is not None:
+    ARRAY_OPERATIONS = {OP_ADD: np.add, OP_SUB: np.subtract, OP_MUL: np.multiply}
+
+def require_numpy():
+    if np is None:
+        raise ImportError("Vectorized evaluation needs NumPy: pip install numpy")
+
+def check_division_policy(division):
+    if division not in DIVISION_POLICIES and (isinstance(division, bool) or not isinstance(division, (int, float))):
+        raise ValueError(f"Unknown division policy {division!r}; use one of {', '.join(DIVISION_POLICIES)} or a number.")
+
+def last_uses(instructions):
+    """Map each temp to the index of the instruction that reads it last."""
+    last = {}
+    for i, instruction in enumerate(instructions):
+        for operand in (instruction.src1, instruction.src2):
+            if isinstance(operand, Temp):
+                last[operand] = i
+    return last
+
+def divide(left, right, division, shape):
+    zero = np.equal(right, 0)
+    if not zero.any():
+        return np.true_divide(left, right)
+    if division == 'raise':
+        element = int(np.flatnonzero(np.broadcast_to(zero, shape))[0])
+        raise RuntimeError(f"Runtime Error: Division by zero at element {element}.")
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.true_divide(left, right)
+    if division == 'inf':
+        return result
+    return np.where(zero, np.nan if division == 'nan' else division, result)
+
+def evaluate_vectorized(instructions, inputs, division='raise'):
+    """Evaluate instructions over arrays; returns {target: array} for every assigned variable.
+
+    inputs maps each free identifier to an array or scalar; they are
+    broadcast together, and every result has the broadcast shape.
+    """
+    require_numpy()
+    check_division_policy(division)
+    env = {}
+    targets = {}
+    for instruction in instructions:
+        for operand in (instruction.src1, instruction.src2):
+            if operand is None or isinstance(operand, (int, float, Temp)):
+                continue
+            if operand not in env and operand not in targets:
+                if operand not in inputs:
+                    raise RuntimeError(f"Runtime Error: No value given for {operand}.")
+                env[operand] = np.asarray(inputs[operand])
+        if not isinstance(instruction.dest, Temp):
+            targets.setdefault(instruction.dest, None)
+    shape = np.broadcast_shapes(*(np.shape(value) for value in inputs.values()))
+
+    def value_of(operand):
+        if isinstance(operand, (int, float)):
+            return operand
+        return env[operand]
+
+    last = last_uses(instructions)
+    owned = set()  # temps holding an array no other name refers to
+    for i, instruction in enumerate(instructions):
+        left = value_of(instruction.src1)
+        if instruction.op == OP_COPY:
+            result = left
+            owned.discard(instruction.src1)
+        elif instruction.op == OP_DIV:
+            result = divide(left, value_of(instruction.src2), division, shape)
+        else:
+            right = value_of(instruction.src2)
+            operation = ARRAY_OPERATIONS[instruction.op]
+            # A temp read for the last time can hand its buffer to the result.
+            src1 = instruction.src1
+            if (src1 in owned and last.get(src1) == i and left.shape == shape
+                    and left.dtype == np.result_type(left, right)):
+                result = operation(left, right, out=left)
+            else:
+                result = operation(left, right)
+        env[instruction.dest] = result
+        if instruction.op != OP_COPY and isinstance(instruction.dest, Temp) and isinstance(result, np.ndarray):
+            owned.add(instruction.dest)
+        for operand in (instruction.src1, instruction.src2):
+            if isinstance(operand, Temp) and last.get(operand) == i and operand != instruction.dest:
+                env.pop(operand, None)
+
+    results = {}
+    for name in targets:
+        value = np.asarray(env[name])
+        if value.shape != shape:
+            value = np.broadcast_to(value, shape).copy()
+        results[name] = value
+    return results
+
+def vectorize_source(source_code, inputs, division='raise', optimize=False):
+    """Compile source and evaluate it over arrays; compiler errors propagate as usual."""
+    instructions = generate_instructions(semantic_analysis(syntax_analysis(tokenize(source_code))))
+    if optimize:
+        from .optimization import optimize as optimize_instructions
+        instructions, _ = optimize_instructions(instructions)
+    return evaluate_vectorized(instructions, inputs, division)
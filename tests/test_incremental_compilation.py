@@ -0,0 +1,111 @@
+import random
+import unittest
+
+from compiler.compile_source import compile_source
+from compiler.incremental_compilation import IncrementalCompiler, DirtyLines, changed_ranges
+
+# ------------------------
+# Incremental Compilation Equivalence
+# ------------------------
+# After every update an IncrementalCompiler must render exactly what
+# compile_source does for the new text. Random edits insert and delete
+# statements, ';', newlines and errors anywhere, so segments get split,
+# merged and moved, and their lines shift (line_shift) when newlines come
+# and go above them.
+PIECES = ['a = 1;', 'b = a + x;', 'c = (b * 2) / y;', ' ', '\n', '\n\n', ';', 'x = x - 1;', 'a=b+c;',
+          'd = 4 / 0;', 'e = (1 + ;', 'f = 2 $ 3;', 'g = a * b * c + d']
+TYPED = PIECES + ['1', 'q', '+', '(', ')']
+
+def random_text(rng, count):
+    return "".join(rng.choice(PIECES) for _ in range(count))
+
+def line_of(text, position):
+    return text.count('\n', 0, position) + 1
+
+def random_edit(rng, text, dirty):
+    """Apply one insert or delete to text, recording it in dirty."""
+    if text and rng.random() < 0.5:
+        start = rng.randrange(len(text))
+        end = min(len(text), start + rng.randint(1, 12))
+        dirty.deleted(line_of(text, start), line_of(text, end))
+        return text[:start] + text[end:]
+    position = rng.randint(0, len(text))
+    inserted = rng.choice(TYPED)
+    dirty.inserted(line_of(text, position), inserted.count('\n'))
+    return text[:position] + inserted + text[position:]
+
+def report_sections(result):
+    return [(phase, list(pieces)) for phase, pieces in result.iter_sections()]
+
+def apply_ranges(report, ranges):
+    lines = report.split('\n')
+    for first_line, last_line, pieces in reversed(ranges):
+        lines[first_line:last_line] = "\n".join(pieces).split('\n') if pieces else []
+    return "\n".join(lines)
+
+class IncrementalCompilationTest(unittest.TestCase):
+
+    def check_edits(self, seed, optimize=False, with_ranges=True):
+        rng = random.Random(seed)
+        for _ in range(40):
+            compiler = IncrementalCompiler()
+            text = random_text(rng, rng.randint(0, 25))
+            self.assertEqual(compiler.update(text, optimize=optimize).render(), compile_source(text, optimize), text)
+            for _ in range(20):
+                dirty = DirtyLines()
+                for _ in range(rng.randint(1, 3)):
+                    text = random_edit(rng, text, dirty)
+                first_line, last_line = dirty.take() if with_ranges else (None, None)
+                result = compiler.update(text, first_line, last_line, optimize=optimize)
+                self.assertEqual(result.render(), compile_source(text, optimize), text)
+
+    def test_edits_with_line_ranges(self):
+        self.check_edits(21)
+
+    def test_edits_without_line_ranges(self):
+        self.check_edits(22, with_ranges=False)
+
+    def test_optimized(self):
+        self.check_edits(23, optimize=True)
+
+    def test_lines_inserted_above(self):
+        # Only line_shift moves the statements below the edit.
+        compiler = IncrementalCompiler()
+        lines = [f"v{i} = v{i - 1} + {i};" for i in range(1, 30)]
+        compiler.update("\n".join(lines)).render()
+        for line in (1, 10, 29):
+            lines[line - 1:line - 1] = ["", "w = 2; z = w * 3;"]
+            text = "\n".join(lines)
+            self.assertEqual(compiler.update(text, line, line + 1).render(), compile_source(text))
+
+    def test_target_code_reused_when_ir_is_unchanged(self):
+        compiler = IncrementalCompiler()
+        previous = compiler.update("a = 1;\nb = a + 2;\nc = b * 3;")
+        previous.render()
+        text = "a = 1;\nb =  a + 2;\nc = b * 3;"
+        result = compiler.update(text, 2, 2)
+        self.assertIs(result.machine_code, previous.machine_code)
+        self.assertEqual(result.render(), compile_source(text))
+        text += "\nd = c;"
+        result = compiler.update(text, 4, 4)
+        self.assertIsNot(result.machine_code, previous.machine_code)
+        self.assertEqual(result.render(), compile_source(text))
+
+    def test_changed_ranges(self):
+        rng = random.Random(24)
+        compiler = IncrementalCompiler()
+        text = random_text(rng, 20)
+        shown = report_sections(compiler.update(text))
+        for _ in range(300):
+            dirty = DirtyLines()
+            text = random_edit(rng, text, dirty)
+            sections = report_sections(compiler.update(text, *dirty.take()))
+            ranges = changed_ranges(shown, sections)
+            for (_, last_line, _), (first_line, _, _) in zip(ranges, ranges[1:]):
+                self.assertLess(last_line, first_line)
+            old_report = "\n".join(piece for _, pieces in shown for piece in pieces)
+            self.assertEqual(apply_ranges(old_report, ranges), compile_source(text), text)
+            shown = sections
+
+if __name__ == "__main__":
+    unittest.main()
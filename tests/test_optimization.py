@@ -0,0 +1,64 @@
+import random
+import unittest
+
+from compiler.bytecode_vm import execute_source
+
+# ------------------------
+# Optimizer Equivalence
+# ------------------------
+# An optimized program must produce the same values, of the same types, and
+# fail with the same error as the unoptimized one on the bytecode VM. It may
+# report fewer variables: `x = x` copies and reads in dead code are dropped.
+NAMES = ['a', 'b', 'x', 'y']
+LITERALS = ['0', '1', '2', '0.0', '1.0', '2.5']
+INPUTS = [0, 1, 2, -1, 0.0, 2.5, float('inf')]
+
+def run(source_code, inputs, optimize):
+    try:
+        return execute_source(source_code, dict(inputs), optimize)
+    except RuntimeError as e:
+        return str(e)
+
+def random_expression(rng, depth=0):
+    if depth > 3 or rng.random() < 0.3:
+        return rng.choice(NAMES) if rng.random() < 0.6 else rng.choice(LITERALS)
+    return f"({random_expression(rng, depth + 1)} {rng.choice('+-*/')} {random_expression(rng, depth + 1)})"
+
+class OptimizerEquivalenceTest(unittest.TestCase):
+
+    def assert_equivalent(self, source_code, inputs):
+        expected = run(source_code, inputs, False)
+        result = run(source_code, inputs, True)
+        if isinstance(expected, str) or isinstance(result, str):
+            self.assertEqual(result, expected, source_code)
+            return
+        self.assertLessEqual(result.keys(), expected.keys(), source_code)
+        for name, value in result.items():
+            other = expected[name]
+            self.assertIs(type(value), type(other), (source_code, name))
+            if value == value or other == other:  # nan never equals itself
+                self.assertEqual(value, other, (source_code, name))
+
+    def test_identities_keep_types(self):
+        self.assert_equivalent("a = x / 1; b = y * 0;", {'x': 3, 'y': 2.5})
+        self.assert_equivalent("a = x + 0.0; b = y * 1.0;", {'x': 3, 'y': 2})
+        self.assert_equivalent("a = x * 0;", {'x': float('inf')})
+
+    def test_dead_division_still_raises(self):
+        self.assert_equivalent("a = x / y; a = 1;", {'x': 3, 'y': 0})
+        self.assert_equivalent("a = (x / y) * 0;", {'x': 3, 'y': 0})
+
+    def test_random_programs(self):
+        rng = random.Random(3)
+        for _ in range(500):
+            lines = [f"{rng.choice(NAMES)} = {random_expression(rng)};" for _ in range(rng.randint(1, 8))]
+            source_code = "\n".join(lines)
+            try:
+                execute_source(source_code, {name: 1 for name in NAMES})
+            except (SyntaxError, RuntimeError):
+                continue
+            for _ in range(3):
+                self.assert_equivalent(source_code, {name: rng.choice(INPUTS) for name in NAMES})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from compiler.compile_source import compile_source
+from compiler.parallel_compilation import compile_parallel, split_program
+
+# ------------------------
+# Parallel Compilation Equivalence
+# ------------------------
+# compile_parallel must render exactly what compile_source does, including
+# which error is reported and where. Several statements share a line, so
+# chunks are cut mid-line, and min_chunk_size=1 cuts even tiny programs.
+NAMES = ['a', 'b', 'x', 'y1', 'total']
+ERRORS = ['$', '(1 + ', '1 / 0', '2 * (3 - 3)', ') 4']
+
+def random_expression(rng, depth=0):
+    if depth > 2 or rng.random() < 0.35:
+        return rng.choice(NAMES) if rng.random() < 0.6 else str(rng.choice([0, 1, 2, 7, 2.5]))
+    return f"({random_expression(rng, depth + 1)} {rng.choice('+-*/')} {random_expression(rng, depth + 1)})"
+
+def random_program(rng, errors):
+    lines = []
+    for _ in range(rng.randint(1, 12)):
+        statements = []
+        for _ in range(rng.randint(1, 4)):
+            expression = random_expression(rng)
+            if errors and rng.random() < 0.05:
+                expression = rng.choice(ERRORS)
+            statements.append(f"{rng.choice(NAMES)} = {expression};")
+        lines.append(" ".join(statements))
+    source_code = "\n".join(lines)
+    return source_code + rng.choice(["", "\n", " b = 1"])
+
+class ParallelCompilationTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def assert_same_render(self, source_code, workers, optimize=False):
+        result = compile_parallel(source_code, workers, self.executor, optimize=optimize, min_chunk_size=1)
+        self.assertEqual(result.render(), compile_source(source_code, optimize=optimize), source_code)
+
+    def test_split_program_cuts_after_semicolons(self):
+        source_code = "a = 1; b = 2;\nc = a + b; d = c;"
+        pieces = split_program(source_code, 3)
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual("".join(text for _, _, _, text in pieces), source_code)
+        for offset, line, column, text in pieces[1:]:
+            self.assertEqual(source_code[offset - 1], ';')
+            before = source_code[:offset]
+            self.assertEqual(line, before.count('\n') + 1)
+            self.assertEqual(column, len(before) - before.rfind('\n'))
+
+    def test_valid_programs(self):
+        rng = random.Random(11)
+        for _ in range(60):
+            self.assert_same_render(random_program(rng, errors=False), rng.randint(2, 4))
+
+    def test_error_programs(self):
+        rng = random.Random(12)
+        for _ in range(60):
+            self.assert_same_render(random_program(rng, errors=True), rng.randint(2, 4))
+
+    def test_optimized(self):
+        rng = random.Random(13)
+        for _ in range(10):
+            self.assert_same_render(random_program(rng, errors=False), 3, optimize=True)
+
+    def test_sections_without_statements(self):
+        for source_code in [";", "a = 1; ;", "; ; a = 1;", "a = 1;\n\n;"]:
+            self.assert_same_render(source_code, 3)
+
+if __name__ == "__main__":
+    unittest.main()